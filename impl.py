@@ -1,14 +1,30 @@
+import asyncio
+import contextvars
+import csv
+import gzip
+import hashlib
+import http.client
+import io
 import json
+import operator
 import os
+import queue
 import re
+import sys
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from collections.abc import MutableSequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, contextmanager
 from inspect import currentframe
-from typing import Optional, Self
+from typing import AsyncIterator, Callable, Iterable, Iterator, Optional, Self, TextIO
 
 import numpy
 import pandas as pd
 import rdflib
 import sqlite3 
-import sparql_dataframe 
 from rdflib.plugins.stores.sparqlstore import SPARQLUpdateStore
 
 class TypeMismatchError(Exception):
@@ -26,6 +42,8 @@ class NotImplementedComparisonError(Exception):
         )
 
 class IdentifiableEntity:
+    __slots__ = ("id",) # no per-instance dictionary: millions of entities can be cached
+
     def __init__(self, id: list[str] | str): 
         if not (isinstance(id, list) and all(isinstance(value, str) for value in id)) and not isinstance(id, str):
             raise TypeMismatchError("a list of strings or a string", id)
@@ -34,7 +52,14 @@ class IdentifiableEntity:
     def __eq__(self, other: Self) -> bool: # checking for value equality
         if type(other) is not type(self): 
             raise NotImplementedComparisonError(self, other) 
-        return self.id == other.id 
+        return self.getIdentityKey() == other.getIdentityKey()
+
+    def __hash__(self): # consistent with __eq__, so entities can go in sets and be dictionary keys
+        return hash((type(self).__name__, self.getIdentityKey()))
+
+    def getIdentityKey(self) -> frozenset[str]:
+        # the ids regardless of their order, case and surrounding spaces (e.g. the ISSNs of a journal)
+        return frozenset(id.strip().casefold() for id in self.getIds())
     
     def getIds(self) -> list[str]:
         if isinstance(self.id, str):   
@@ -42,26 +67,26 @@ class IdentifiableEntity:
         return self.id
     
 class Category(IdentifiableEntity):
+    __slots__ = ("quartile",)
+
     def __init__(self, id, quartile: Optional[str]): 
         super().__init__(id) 
         if quartile is not None and not isinstance(quartile, str):
             raise TypeMismatchError("a NoneType or str", quartile)
-        self.quartile = quartile 
-
-    def __hash__(self):
-        return hash((self.id, self.id))
+        self.quartile = internValue(quartile) 
         
     def getQuartile(self): 
         return self.quartile 
 
 class Area(IdentifiableEntity): 
+    __slots__ = ()
+
     def __init__(self, id): 
         super().__init__(id) 
 
-    def __hash__(self):
-        return hash((self.id, self.id))
-
 class Journal(IdentifiableEntity):
+    __slots__ = ("title", "languages", "publisher", "seal", "license", "apc", "hasCategory", "hasArea")
+
     def __init__(self, id, title: str, languages: str | list, publisher: Optional[str], 
                  seal: bool, license: str, apc: bool):
         super().__init__(id)
@@ -85,11 +110,11 @@ class Journal(IdentifiableEntity):
             raise TypeMismatchError("a boolean", apc)
         
         self.title = title
-        self.languages = languages
-        self.publisher = publisher
-        self.seal = seal
-        self.license = license
-        self.apc = apc
+        self.languages = internLanguages(languages)
+        self.publisher = internValue(publisher)
+        self.seal = bool(seal)
+        self.license = internValue(license)
+        self.apc = bool(apc)
         self.hasCategory: list[Category] = [] 
         self.hasArea: list[Area] = []
 
@@ -109,7 +134,7 @@ class Journal(IdentifiableEntity):
     def getLanguages(self):
         if isinstance(self.languages, str):
             return [self.languages]
-        return self.languages
+        return list(self.languages)
 
     def getPublisher(self):
         return self.publisher
@@ -131,6 +156,361 @@ class Journal(IdentifiableEntity):
     def getAreas(self):
         return self.hasArea
 
+# the values shared by many entities: strings with few distinct values are interned, the combinations of languages
+# are kept once as tuples, and the categories and areas linked to journals are flyweights, built once per id (and quartile)
+sharedLanguages: dict[tuple[str, ...], tuple[str, ...]] = {}
+sharedEntities: dict[tuple, IdentifiableEntity] = {}
+sharedEntitiesLock = threading.Lock()
+
+def internValue(value):
+    return sys.intern(value) if type(value) is str else value
+
+def internLanguages(languages: str | list) -> str | tuple[str, ...]:
+    if isinstance(languages, str):
+        return internValue(languages)
+    languages = tuple(internValue(language) for language in languages)
+    with sharedEntitiesLock:
+        return sharedLanguages.setdefault(languages, languages)
+
+def getSharedEntity(entity_type: type, id: list[str] | str, *args) -> IdentifiableEntity:
+    # Category and Area have no setters, so one instance can stand for all the equal ones
+    key = (entity_type, tuple(id) if isinstance(id, list) else id) + args
+    with sharedEntitiesLock:
+        entity = sharedEntities.get(key)
+    if entity is None:
+        entity = entity_type(id, *args)
+        with sharedEntitiesLock:
+            entity = sharedEntities.setdefault(key, entity)
+    return entity
+
+def getSharedCategory(id: list[str] | str, quartile: Optional[str]) -> Category:
+    return getSharedEntity(Category, id, quartile)
+
+def getSharedArea(id: list[str] | str) -> Area:
+    return getSharedEntity(Area, id)
+
+class JournalCollection(MutableSequence):
+    # list-compatible result of the engines' journal methods, kept as columns: one value per journal in each column, 
+    # and the links to the categories and areas in CSR form (as in JournalSnapshot). A Journal is only built when its 
+    # position is indexed or iterated, and then kept: the collections taken from one another are views (ordinals) 
+    # of the same columns, so they share the journals already built. The first change (append, sort, ...) turns a 
+    # collection into a plain list of its journals, and its columns are rebuilt from that list when next needed
+    columnNames = ("journal-ids", "title", "languages", "publisher", "seal", "license", "apc")
+
+    def __init__(self, columns: dict[str, numpy.ndarray], categoryIndptr: numpy.ndarray, categoryLinks: numpy.ndarray, 
+                 areaIndptr: numpy.ndarray, areaLinks: numpy.ndarray, journals: Optional[list[Optional[Journal]]] = None, 
+                 createJournal: Optional[Callable[[dict, Optional[dict]], Journal]] = None, ordinals: Optional[numpy.ndarray] = None):
+        size = len(columns["journal-ids"])
+        self.columns = columns
+        self.categoryIndptr = categoryIndptr
+        self.categoryLinks = categoryLinks
+        self.areaIndptr = areaIndptr
+        self.areaLinks = areaLinks
+        self.journals = journals if journals is not None else [None] * size # shared by the views
+        self.createJournal = createJournal # BasicQueryEngine.createJournal (journal row, category row) of the engine
+        self.ordinals = ordinals if ordinals is not None else numpy.arange(size, dtype=numpy.int64)
+        self.identityKeys = None
+        self.items: Optional[list[Journal]] = None # the journals once the collection has been changed
+
+    def __len__(self) -> int:
+        if self.items is not None:
+            return len(self.items)
+        return len(self.ordinals)
+
+    def __getitem__(self, index):
+        if self.items is not None:
+            return getJournalCollection(self.items[index]) if isinstance(index, slice) else self.items[index]
+        if isinstance(index, slice):
+            return self.take(numpy.arange(len(self))[index])
+        position = operator.index(index)
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("journal index out of range")
+        ordinal = int(self.ordinals[position])
+        journal = self.journals[ordinal]
+        if journal is None:
+            journal = self.buildJournal(ordinal)
+            self.journals[ordinal] = journal
+        return journal
+
+    def __setitem__(self, index, value):
+        journals = self.getItems()
+        if isinstance(index, slice):
+            value = list(value)
+            for journal in value:
+                self.checkJournal(journal)
+        else:
+            self.checkJournal(value)
+        journals[index] = value
+
+    def __delitem__(self, index):
+        del self.getItems()[index]
+
+    def __iter__(self) -> Iterator[Journal]:
+        if self.items is not None:
+            yield from self.items
+            return
+        for position in range(len(self)):
+            yield self[position]
+
+    def __contains__(self, entity) -> bool:
+        if not isinstance(entity, Journal):
+            return False
+        if self.items is not None: # a scan, as in a list, rather than rebuilding the columns after each change
+            key = entity.getIdentityKey()
+            return any(journal.getIdentityKey() == key for journal in self.items)
+        return entity.getIdentityKey() in self.getKeySet()
+
+    def insert(self, index: int, value: Journal):
+        self.checkJournal(value)
+        self.getItems().insert(index, value)
+
+    def append(self, value: Journal):
+        self.checkJournal(value)
+        self.getItems().append(value)
+
+    def extend(self, values: Iterable[Journal]):
+        values = list(values)
+        for journal in values:
+            self.checkJournal(journal)
+        self.getItems().extend(values)
+
+    def clear(self):
+        self.getItems().clear()
+
+    def reverse(self):
+        self.getItems().reverse()
+
+    def sort(self, *, key: Optional[Callable[[Journal], object]] = None, reverse: bool = False):
+        self.getItems().sort(key=key, reverse=reverse)
+
+    def copy(self) -> "JournalCollection":
+        if self.items is not None:
+            return getJournalCollection(self.items)
+        return self.take(numpy.arange(len(self)))
+
+    def checkJournal(self, value: object):
+        if not isinstance(value, Journal):
+            raise TypeMismatchError("a Journal", value)
+
+    def getItems(self) -> list[Journal]:
+        if self.items is None:
+            self.items = list(self)
+            self.identityKeys = None
+        return self.items
+
+    def restoreColumns(self):
+        # the columns of a changed collection, rebuilt from its journals
+        if self.items is None:
+            return
+        collection = getJournalCollection(self.items)
+        self.columns = collection.columns
+        self.categoryIndptr, self.categoryLinks = collection.categoryIndptr, collection.categoryLinks
+        self.areaIndptr, self.areaLinks = collection.areaIndptr, collection.areaLinks
+        self.journals, self.ordinals = collection.journals, collection.ordinals
+        self.identityKeys = None
+        self.items = None
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, JournalCollection):
+            return self.getIdentityKeys() == other.getIdentityKeys()
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    __hash__ = None # mutable, like a list
+
+    def __add__(self, other):
+        if not isinstance(other, (JournalCollection, list)):
+            return NotImplemented
+        return concatJournalCollections([self, getJournalCollection(other)])
+
+    def __radd__(self, other):
+        if not isinstance(other, list):
+            return NotImplemented
+        return concatJournalCollections([getJournalCollection(other), self])
+
+    def __iadd__(self, other: Iterable[Journal]) -> "JournalCollection":
+        self.extend(other)
+        return self
+
+    # set operations on the identity keys: the journals of the left operand first, each of them once
+    def __or__(self, other: Iterable[Journal]) -> "JournalCollection":
+        return concatJournalCollections([self, getJournalCollection(other)]).unique()
+
+    def __and__(self, other: Iterable[Journal]) -> "JournalCollection":
+        return self.filter(self.getKeyMask(other)).unique()
+
+    def __sub__(self, other: Iterable[Journal]) -> "JournalCollection":
+        return self.filter(~self.getKeyMask(other)).unique()
+
+    def __repr__(self) -> str:
+        return f"JournalCollection({len(self)} journals)"
+
+    def buildJournal(self, ordinal: int) -> Journal:
+        # the rows BasicQueryEngine.createJournal builds a journal from, taken from the columns
+        journal_row = {name: self.columns[name][ordinal] for name in self.columnNames}
+        category_row = {
+            "entity-type": "journal",
+            "categories-with-quartiles": {", ".join(category.getIds()): category.getQuartile() 
+                                          for category in self.categoryLinks[self.categoryIndptr[ordinal]:self.categoryIndptr[ordinal + 1]]},
+            "areas": [", ".join(area.getIds()) for area in self.areaLinks[self.areaIndptr[ordinal]:self.areaIndptr[ordinal + 1]]]
+        }
+        return self.createJournal(journal_row, category_row)
+
+    def take(self, positions: numpy.ndarray) -> "JournalCollection":
+        self.restoreColumns()
+        return JournalCollection(self.columns, self.categoryIndptr, self.categoryLinks, self.areaIndptr, self.areaLinks, 
+                                 self.journals, self.createJournal, self.ordinals[numpy.asarray(positions, dtype=numpy.int64)])
+
+    def getColumn(self, name: str) -> numpy.ndarray:
+        self.restoreColumns()
+        return self.columns[name][self.ordinals]
+
+    def getIdentityKeys(self) -> list[frozenset[str]]:
+        # as IdentifiableEntity.getIdentityKey, from the ids column
+        self.restoreColumns()
+        if self.identityKeys is None:
+            self.identityKeys = [frozenset(id_.strip().casefold() for id_ in ids.split(",")) for ids in self.getColumn("journal-ids")]
+        return self.identityKeys
+
+    def getKeySet(self) -> set[frozenset[str]]:
+        return set(self.getIdentityKeys())
+
+    def getKeyMask(self, journals: Iterable[Journal]) -> numpy.ndarray:
+        if isinstance(journals, JournalCollection):
+            keys = journals.getKeySet()
+        else:
+            keys = {journal.getIdentityKey() for journal in journals if isinstance(journal, Journal)}
+        return numpy.fromiter((key in keys for key in self.getIdentityKeys()), dtype=bool, count=len(self))
+
+    def unique(self) -> "JournalCollection":
+        # the first of the equal journals, as BasicQueryEngine.uniqueEntities
+        first_positions = {}
+        for position, key in enumerate(self.getIdentityKeys()):
+            first_positions.setdefault(key, position)
+        return self.take(numpy.fromiter(first_positions.values(), dtype=numpy.int64, count=len(first_positions)))
+
+    def filter(self, mask: Optional[numpy.ndarray] = None, title: Optional[str] = None, publisher: Optional[str] = None, 
+               licenses: Optional[Iterable[str]] = None, apc: Optional[bool] = None, seal: Optional[bool] = None) -> "JournalCollection":
+        # the journals matching all the conditions given, checked on the columns: a boolean mask (one value per journal),
+        # partial title and publisher, one of the licenses (None or no licenses for any) and the APC and seal flags
+        matches = numpy.ones(len(self), dtype=bool)
+        if mask is not None:
+            mask = numpy.asarray(mask, dtype=bool)
+            if mask.shape != matches.shape:
+                raise ValueError(f"expected a mask of {len(self)} values, got {mask.shape}")
+            matches &= mask
+        if title is not None:
+            matches &= self.getTextMask("title", title)
+        if publisher is not None:
+            matches &= self.getTextMask("publisher", publisher)
+        if licenses:
+            license_mask = numpy.zeros(len(self), dtype=bool)
+            for license_val in {l.strip().lower() for l in licenses}:
+                license_mask |= self.getTextMask("license", license_val)
+            matches &= license_mask
+        if apc is not None:
+            matches &= self.getColumn("apc") == bool(apc)
+        if seal is not None:
+            matches &= self.getColumn("seal") == bool(seal)
+        return self.take(numpy.flatnonzero(matches))
+
+    def getTextMask(self, name: str, partial: str) -> numpy.ndarray:
+        values = pd.Series(self.getColumn(name), dtype=object).astype(str).str.lower()
+        return values.str.contains(str(partial).lower(), regex=False).to_numpy(dtype=bool)
+
+    def getLinkMask(self, indptr: numpy.ndarray, links: numpy.ndarray, match) -> numpy.ndarray:
+        # the journals with at least one link matching: the links are flyweights, so each one is checked once
+        checked = {}
+        link_mask = numpy.fromiter((checked[id(link)] if id(link) in checked else checked.setdefault(id(link), match(link)) 
+                                    for link in links), dtype=bool, count=len(links))
+        rows = numpy.repeat(numpy.arange(len(indptr) - 1), numpy.diff(indptr))
+        return (numpy.bincount(rows[link_mask], minlength=len(indptr) - 1) > 0)[self.ordinals]
+
+    def getCategoryMask(self, categories: Optional[set[Category]], quartiles: Optional[set[str]]) -> numpy.ndarray:
+        # journals with one of the categories (any for None), in one of the quartiles or with no quartile (any for None)
+        self.restoreColumns()
+        return self.getLinkMask(self.categoryIndptr, self.categoryLinks, lambda category: (
+            (categories is None or category in categories)
+            and (quartiles is None or category.getQuartile() is None or category.getQuartile() in quartiles)
+        ))
+
+    def getAreaMask(self, areas: Optional[set[Area]]) -> numpy.ndarray:
+        self.restoreColumns()
+        return self.getLinkMask(self.areaIndptr, self.areaLinks, lambda area: areas is None or area in areas)
+
+    def toFrame(self) -> pd.DataFrame:
+        # one row per journal, with the columns of the journal handlers and the categories and areas as in CategoryQueryHandler.getByIds
+        self.restoreColumns()
+        journals_df = pd.DataFrame({name: self.getColumn(name) for name in self.columnNames})
+        categories = [self.categoryLinks[self.categoryIndptr[ordinal]:self.categoryIndptr[ordinal + 1]] for ordinal in self.ordinals]
+        areas = [self.areaLinks[self.areaIndptr[ordinal]:self.areaIndptr[ordinal + 1]] for ordinal in self.ordinals]
+        journals_df["categories-with-quartiles"] = [{", ".join(category.getIds()): category.getQuartile() for category in links} 
+                                                     for links in categories]
+        journals_df["areas"] = [[", ".join(area.getIds()) for area in links] for links in areas]
+        return journals_df
+
+def toObjectArray(values: list) -> numpy.ndarray:
+    array = numpy.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+def createLinkArrays(linked_entities: list[list[IdentifiableEntity]]) -> tuple[numpy.ndarray, numpy.ndarray]:
+    counts = numpy.fromiter((len(entities) for entities in linked_entities), dtype=numpy.int64, count=len(linked_entities))
+    indptr = numpy.concatenate(([0], numpy.cumsum(counts))).astype(numpy.int64)
+    return indptr, toObjectArray([entity for entities in linked_entities for entity in entities])
+
+def createJournalCollection(rows: dict[str, list], categories: list[list[Category]], areas: list[list[Area]], 
+                            journals: Optional[list[Optional[Journal]]] = None, 
+                            createJournal: Optional[Callable[[dict, Optional[dict]], Journal]] = None) -> JournalCollection:
+    # from one list per column and the categories and areas of each journal
+    columns = {name: toObjectArray(list(rows[name])) for name in JournalCollection.columnNames if name not in ("seal", "apc")}
+    columns["seal"] = numpy.array([bool(value) for value in rows["seal"]], dtype=bool)
+    columns["apc"] = numpy.array([bool(value) for value in rows["apc"]], dtype=bool)
+    category_indptr, category_links = createLinkArrays(categories)
+    area_indptr, area_links = createLinkArrays(areas)
+    return JournalCollection(columns, category_indptr, category_links, area_indptr, area_links, journals, createJournal)
+
+def getJournalCollection(journals: Iterable[Journal]) -> JournalCollection:
+    # the journals as a collection, already built
+    if isinstance(journals, JournalCollection):
+        return journals
+    journals = list(journals)
+    rows = {
+        "journal-ids": [", ".join(journal.getIds()) for journal in journals],
+        "title": [journal.getTitle() for journal in journals],
+        "languages": [", ".join(journal.getLanguages()) for journal in journals],
+        "publisher": [journal.getPublisher() for journal in journals],
+        "seal": [journal.hasDOAJSeal() for journal in journals],
+        "license": [journal.getLicense() for journal in journals],
+        "apc": [journal.hasAPC() for journal in journals],
+    }
+    categories = [journal.getCategories() or [] for journal in journals]
+    areas = [journal.getAreas() or [] for journal in journals]
+    return createJournalCollection(rows, categories, areas, journals)
+
+def concatJournalCollections(collections: Iterable[JournalCollection]) -> JournalCollection:
+    # always a new collection, as with lists, so that changing it leaves the ones concatenated as they are
+    collections = [collection for collection in collections if len(collection)]
+    if not collections:
+        return createJournalCollection({name: [] for name in JournalCollection.columnNames}, [], [])
+    for collection in collections:
+        collection.restoreColumns()
+    first = collections[0]
+    if all(collection.columns is first.columns for collection in collections): # views of the same columns
+        return JournalCollection(first.columns, first.categoryIndptr, first.categoryLinks, first.areaIndptr, first.areaLinks, 
+                                 first.journals, first.createJournal, numpy.concatenate([collection.ordinals for collection in collections]))
+    rows = {name: [value for collection in collections for value in collection.getColumn(name)] for name in JournalCollection.columnNames}
+    categories = [list(collection.categoryLinks[collection.categoryIndptr[ordinal]:collection.categoryIndptr[ordinal + 1]]) 
+                  for collection in collections for ordinal in collection.ordinals]
+    areas = [list(collection.areaLinks[collection.areaIndptr[ordinal]:collection.areaIndptr[ordinal + 1]]) 
+             for collection in collections for ordinal in collection.ordinals]
+    journals = [collection.journals[ordinal] for collection in collections for ordinal in collection.ordinals]
+    create_journal = next((collection.createJournal for collection in collections if collection.createJournal is not None), None)
+    return createJournalCollection(rows, categories, areas, journals, create_journal)
+
 class Handler: 
     def __init__(self):
         self.dbPathOrUrl = "" 
@@ -146,6 +526,125 @@ class Handler:
             return True
         return False 
 
+# number of uploads to each database, so that the caches built on its previous data can tell they are stale
+dataVersions: dict[str, int] = {}
+dataVersionsLock = threading.Lock()
+
+def getDataVersionKey(pathOrUrl: str) -> str:
+    return pathOrUrl if "://" in pathOrUrl else os.path.abspath(pathOrUrl)
+
+def getDataVersion(pathOrUrl: str) -> int:
+    with dataVersionsLock:
+        return dataVersions.get(getDataVersionKey(pathOrUrl), 0)
+
+def bumpDataVersion(pathOrUrl: str) -> int:
+    with dataVersionsLock:
+        key = getDataVersionKey(pathOrUrl)
+        dataVersions[key] = dataVersions.get(key, 0) + 1
+        return dataVersions[key]
+
+# number of journals per license, APC, seal, category, area and quartile of each database, used to plan the mash-up queries
+dataStatistics: dict[str, pd.DataFrame] = {}
+dataStatisticsLock = threading.Lock()
+
+def getDataStatistics(pathOrUrl: str) -> Optional[pd.DataFrame]:
+    with dataStatisticsLock:
+        return dataStatistics.get(getDataVersionKey(pathOrUrl))
+
+def setDataStatistics(pathOrUrl: str, statistics_df: Optional[pd.DataFrame]):
+    with dataStatisticsLock:
+        if statistics_df is None:
+            dataStatistics.pop(getDataVersionKey(pathOrUrl), None)
+        else:
+            dataStatistics[getDataVersionKey(pathOrUrl)] = statistics_df
+
+def countJournalStatistics(journals_df: pd.DataFrame) -> pd.DataFrame:
+    # from rows with a license, an apc and a seal column (and a count column when a row stands for several journals)
+    counts = journals_df["count"].astype(int) if "count" in journals_df.columns else pd.Series(1, index=journals_df.index)
+    statistics_dfs = [pd.DataFrame({"kind": ["journals"], "value": [None], "count": [int(counts.sum())]})]
+    for kind in ("license", "apc", "seal"):
+        values = journals_df[kind].astype(str)
+        if kind != "license":
+            values = values.str.lower()
+        statistics_dfs.append(counts.groupby(values.to_numpy()).sum().rename_axis("value").reset_index(name="count").assign(kind=kind))
+    return mergeStatistics(statistics_dfs)
+
+def mergeStatistics(statistics_dfs: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    # the counts of several uploads or databases added together
+    statistics_dfs = [statistics_df for statistics_df in statistics_dfs if statistics_df is not None and not statistics_df.empty]
+    if not statistics_dfs:
+        return pd.DataFrame(columns=["kind", "value", "count"])
+    statistics_df = pd.concat([statistics_df[["kind", "value", "count"]].astype({"value": object}) for statistics_df in statistics_dfs])
+    return statistics_df.groupby(["kind", "value"], dropna=False, sort=False)["count"].sum().reset_index()
+
+class EmbeddedRDFStore:
+    # rdflib graph living in this process, used instead of a SPARQL endpoint for paths ending in ".nt" (kept on disk as 
+    # N-Triples, loaded on first use and saved on close) and for "memory://<name>" (in memory only): the queries of 
+    # JournalQueryHandler run on it directly and the results become data frames without any serialization
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.graph = rdflib.Graph()
+        self.lock = threading.RLock()
+        self.changed = False
+        if path is not None and os.path.exists(path):
+            self.graph.parse(path, format="nt")
+
+    def select(self, query: str) -> pd.DataFrame:
+        with self.lock:
+            result = self.graph.query(query)
+            columns = [str(var) for var in result.vars]
+            rows = [[self.toValue(term) for term in row] for row in result]
+        results_df = pd.DataFrame(rows, columns=columns, dtype=object)
+        for column in results_df.columns: # typed like the decoded TSV results
+            values = results_df[column]
+            if len(values) and values.map(lambda value: isinstance(value, bool)).all():
+                results_df[column] = values.astype(bool)
+            elif len(values) and values.map(lambda value: isinstance(value, int) and not isinstance(value, bool)).all():
+                results_df[column] = values.astype("int64")
+        return results_df
+
+    def toValue(self, term: Optional[rdflib.term.Node]) -> object:
+        if term is None: # unbound variable
+            return None
+        if isinstance(term, rdflib.Literal) and term.datatype in (rdflib.XSD.boolean, rdflib.XSD.integer):
+            return term.toPython()
+        return str(term)
+
+    def update(self, update: str):
+        with self.lock:
+            self.graph.update(update)
+            self.changed = True
+
+    def insertTriples(self, triples: list[str]):
+        # N-Triples lines are parsed as they are, faster than the same lines in an INSERT DATA request
+        with self.lock:
+            self.graph.parse(data="\n".join(triples), format="nt")
+            self.changed = True
+
+    def close(self):
+        # the graph stays loaded for the other handlers: closing only saves the changes
+        with self.lock:
+            if self.path is None or not self.changed:
+                return
+            temporary_path = self.path + ".tmp"
+            self.graph.serialize(destination=temporary_path, format="nt", encoding="utf-8")
+            os.replace(temporary_path, self.path)
+            self.changed = False
+
+# the embedded stores of this process, one per path, shared by all the handlers using it
+embeddedStores: dict[str, EmbeddedRDFStore] = {}
+embeddedStoresLock = threading.Lock()
+
+def isEmbeddedStore(pathOrUrl: str) -> bool:
+    return pathOrUrl.startswith("memory://") or pathOrUrl.endswith(".nt")
+
+def getEmbeddedStore(pathOrUrl: str) -> EmbeddedRDFStore:
+    with embeddedStoresLock:
+        key = getDataVersionKey(pathOrUrl)
+        if key not in embeddedStores:
+            embeddedStores[key] = EmbeddedRDFStore(None if pathOrUrl.startswith("memory://") else key)
+        return embeddedStores[key]
+
 class UploadHandler(Handler):
     def __init__(self):
         super().__init__()
@@ -153,25 +652,72 @@ class UploadHandler(Handler):
     def pushDataToDb(self, _: str) -> bool: 
         pass
 
+    def markDataChanged(self): # invalidates the entity caches of the query engines reading from this database
+        if self.dbPathOrUrl:
+            bumpDataVersion(self.dbPathOrUrl)
+
+    def recordStatistics(self, statistics_df: Optional[pd.DataFrame]):
+        # the counts of everything the database holds after an upload, or None when only the store can tell 
+        # (the query handler then counts them again)
+        if self.dbPathOrUrl:
+            setDataStatistics(self.dbPathOrUrl, statistics_df)
+
 class JournalUploadHandler(UploadHandler):
-    def createJournalGraph(self, csv_file: str) -> rdflib.Graph: # Martina & Rumana
-        j_graph = rdflib.Graph() # initialising an empty graph
-            
-        # referencing all the classes:    
-        Journal = rdflib.URIRef("https://schema.org/Periodical")   
-    
-        # referencing the attributes:
-        id = rdflib.URIRef("https://schema.org/identifier")
-        title = rdflib.URIRef("https://schema.org/name")
-        languages = rdflib.URIRef("https://schema.org/inLanguage") # (superseded /Language)
-        publisher = rdflib.URIRef("https://schema.org/publisher")
-        seal = rdflib.URIRef("https://schema.org/hasDOAJSeal") # invented
-        license = rdflib.URIRef("https://schema.org/license")
-        apc = rdflib.URIRef("https://schema.org/hasAPC") # invented
-            
-        
+    def __init__(self):
+        super().__init__()
+        self.batchSize = 10000 # triples sent per INSERT DATA request
+        self.chunkSize = None # CSV rows parsed at a time in streaming mode, None to read the whole file
+        self.queueSize = 4 # parsed chunks allowed to wait for the upload in streaming mode
+        self.manifestPath = None # SQLite sidecar with the per-journal hashes used in delta mode
+        self.textIndexPath = None # SQLite sidecar with the full-text index of the titles and publishers
+
+    def setDbPathOrUrl(self, pathOrUrl: str) -> bool:
+        # besides Blazegraph, the journals can go to an embedded rdflib graph (memory:// or an N-Triples file)
+        if isEmbeddedStore(pathOrUrl):
+            self.dbPathOrUrl = pathOrUrl
+            return True
+        return super().setDbPathOrUrl(pathOrUrl)
+
+    def getBatchSize(self) -> int:
+        return self.batchSize
+
+    def setBatchSize(self, batchSize: int) -> bool:
+        if not isinstance(batchSize, int) or isinstance(batchSize, bool) or batchSize < 1:
+            return False
+        self.batchSize = batchSize
+        return True
+
+    def getChunkSize(self) -> Optional[int]:
+        return self.chunkSize
+
+    def setChunkSize(self, chunkSize: Optional[int]) -> bool:
+        if chunkSize is not None and (not isinstance(chunkSize, int) or isinstance(chunkSize, bool) or chunkSize < 1):
+            return False
+        self.chunkSize = chunkSize
+        return True
+
+    def getManifestPath(self) -> Optional[str]:
+        return self.manifestPath
+
+    def setManifestPath(self, manifestPath: Optional[str]) -> bool:
+        if manifestPath is not None and (not manifestPath.strip() or not manifestPath.endswith(".db")):
+            return False
+        self.manifestPath = manifestPath
+        return True
+
+    def getTextIndexPath(self) -> Optional[str]:
+        return self.textIndexPath
+
+    def setTextIndexPath(self, textIndexPath: Optional[str]) -> bool:
+        if textIndexPath is not None and (not textIndexPath.strip() or not textIndexPath.endswith(".db")):
+            return False
+        self.textIndexPath = textIndexPath
+        return True
+
+    def readJournalCsv(self, csv_file: str, chunksize: Optional[int] = None) -> pd.DataFrame | Iterator[pd.DataFrame]:
         journals = pd.read_csv(csv_file, 
                            keep_default_na=False, 
+                           chunksize=chunksize, 
                            dtype={
                                   'Journal title': 'str', 
                                   'Languages in which the journal accepts manuscripts': 'str', 
@@ -182,7 +728,11 @@ class JournalUploadHandler(UploadHandler):
                                   'Journal license': 'str',
                                   'APC': 'str' 
                            })
-        
+        if chunksize is not None: # the row index keeps counting across chunks, so the subject IRIs do not change
+            return (self.normaliseJournalFrame(chunk) for chunk in journals)
+        return self.normaliseJournalFrame(journals)
+
+    def normaliseJournalFrame(self, journals: pd.DataFrame) -> pd.DataFrame:
         journals = journals.rename(columns={'Journal title': 'title', 
                                              'Languages in which the journal accepts manuscripts': 'languages', 
                                              'Journal ISSN (print version)': 'issn',
@@ -192,9 +742,27 @@ class JournalUploadHandler(UploadHandler):
                                              'Journal license': 'license',
                                              'APC': 'apc'})
         
-        
         journals['apc'] = journals['apc'].str.lower().map({'yes': True,'no': False}).fillna(False).astype('bool')
         journals['seal'] = journals['seal'].str.lower().map({'yes': True, 'no': False}).fillna(False).astype('bool')
+        return journals
+
+    def createJournalGraph(self, csv_file: str) -> rdflib.Graph: # Martina & Rumana
+        j_graph = rdflib.Graph() # initialising an empty graph
+            
+        # referencing all the classes:    
+        Journal = rdflib.URIRef("https://schema.org/Periodical")   
+    
+        # referencing the attributes:
+        id = rdflib.URIRef("https://schema.org/identifier")
+        title = rdflib.URIRef("https://schema.org/name")
+        languages = rdflib.URIRef("https://schema.org/inLanguage") # (superseded /Language)
+        publisher = rdflib.URIRef("https://schema.org/publisher")
+        seal = rdflib.URIRef("https://schema.org/hasDOAJSeal") # invented
+        license = rdflib.URIRef("https://schema.org/license")
+        apc = rdflib.URIRef("https://schema.org/hasAPC") # invented
+        issn_key = rdflib.URIRef("https://schema.org/issn") # one per ISSN/EISSN, for exact lookups
+            
+        journals = self.readJournalCsv(csv_file)
 
         base_url = "https://github.com/git-lost-data-science/res/"
             
@@ -226,66 +794,586 @@ class JournalUploadHandler(UploadHandler):
             j_graph.add((subj, seal, rdflib.Literal(row["seal"])))    
             j_graph.add((subj, license, rdflib.Literal(row["license"])))
             j_graph.add((subj, apc, rdflib.Literal(row["apc"]))) 
+            for key in dict.fromkeys(value.upper() for value in (issn, eissn) if value):
+                j_graph.add((subj, issn_key, rdflib.Literal(key)))
         return j_graph
+
+    def createJournalNTriples(self, journals: pd.DataFrame, stable_ids: bool = False) -> numpy.ndarray:
+        # columnar equivalent of createJournalGraph: same triples, built as whole-column string operations
+        # and returned as N-Triples lines (grouped by journal), without going through an rdflib.Graph
+        ntriples = self.createJournalNTriplesTable(journals, stable_ids).ravel()
+        return ntriples[ntriples != ""]
+
+    def createJournalNTriplesTable(self, journals: pd.DataFrame, stable_ids: bool = False) -> numpy.ndarray:
+        # one row per journal and one column per predicate, with "" for the ISSN keys a journal does not have
+        subjects = self.createJournalSubjects(journals, stable_ids)
+
+        issn = journals["issn"].str.strip()
+        eissn = journals["eissn"].str.strip()
+        combined_ids = (issn + ", " + eissn).where(eissn != "", issn).where(issn != "", eissn)
+
+        objects = [
+            pd.Series("<https://schema.org/Periodical>", index=journals.index),
+            self.toNTriplesLiteral(combined_ids),
+            self.toNTriplesLiteral(journals["title"]),
+            self.toNTriplesLiteral(journals["languages"]),
+            self.toNTriplesLiteral(journals["publisher"]),
+            self.toNTriplesBoolean(journals["seal"]),
+            self.toNTriplesLiteral(journals["license"]),
+            self.toNTriplesBoolean(journals["apc"]),
+        ]
+        predicates = [
+            "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>",
+            "<https://schema.org/identifier>",
+            "<https://schema.org/name>",
+            "<https://schema.org/inLanguage>",
+            "<https://schema.org/publisher>",
+            "<https://schema.org/hasDOAJSeal>",
+            "<https://schema.org/license>",
+            "<https://schema.org/hasAPC>",
+        ]
+        columns = [(subjects + " " + predicate + " " + obj + " .").to_numpy(dtype=object) 
+                   for predicate, obj in zip(predicates, objects)]
+
+        # the exact-match keys looked up by JournalQueryHandler: each ISSN and EISSN on its own, upper-cased
+        issn_key = issn.str.upper()
+        eissn_key = eissn.str.upper()
+        for key, present in ((issn_key, issn_key != ""), (eissn_key, (eissn_key != "") & (eissn_key != issn_key))):
+            lines = subjects + " <https://schema.org/issn> " + self.toNTriplesLiteral(key) + " ."
+            columns.append(lines.where(present, "").to_numpy(dtype=object))
+        return numpy.column_stack(columns) if columns[0].size else numpy.empty((0, len(columns)), dtype=object)
+
+    def createJournalSubjects(self, journals: pd.DataFrame, stable_ids: bool = False) -> pd.Series:
+        base_url = "<https://github.com/git-lost-data-science/res/journal-"
+        if not stable_ids: # position-based, as in createJournalGraph
+            return pd.Series(base_url + journals.index.astype(str) + ">", index=journals.index)
+
+        # keyed by the print ISSN (or the EISSN), so the IRI survives a reordering of the DOAJ export
+        issn = journals["issn"].str.strip().str.upper()
+        eissn = journals["eissn"].str.strip().str.upper()
+        keys = issn.where(issn != "", eissn)
+        no_ids = keys == ""
+        if no_ids.any(): # journals without any ISSN fall back to a hash of their title
+            keys[no_ids] = ["title-" + hashlib.sha1(title.encode("utf-8")).hexdigest()[:16] 
+                            for title in journals.loc[no_ids, "title"]]
+        return base_url + keys + ">"
+
+    def toNTriplesLiteral(self, values: pd.Series) -> pd.Series:
+        escaped = (values.astype(str)
+                   .str.replace("\\", "\\\\", regex=False)
+                   .str.replace('"', '\\"', regex=False)
+                   .str.replace("\n", "\\n", regex=False)
+                   .str.replace("\r", "\\r", regex=False))
+        return '"' + escaped + '"'
+
+    def toNTriplesBoolean(self, values: pd.Series) -> pd.Series:
+        boolean_type = "^^<http://www.w3.org/2001/XMLSchema#boolean>"
+        return pd.Series(numpy.where(values.to_numpy(dtype=bool), '"true"' + boolean_type, '"false"' + boolean_type), 
+                         index=values.index)
+
+    def writeJournalNTriples(self, csv_file: str, destination: str | TextIO) -> int:
+        # serialises the CSV straight to an N-Triples file (or any text buffer), returns the number of triples written
+        ntriples = self.createJournalNTriples(self.readJournalCsv(csv_file))
+        if isinstance(destination, str):
+            with open(destination, "w", encoding="utf-8") as f:
+                f.writelines(line + "\n" for line in ntriples)
+        else:
+            destination.writelines(line + "\n" for line in ntriples)
+        return len(ntriples)
+
+    def writeJournalText(self, journals: pd.DataFrame, subjects: pd.Series, replace: bool = False):
+        # keeps the full-text index in step with the store: the title and publisher of every journal uploaded 
+        # to this endpoint, added to the previous ones or (replace) instead of them
+        if self.textIndexPath is None:
+            return
+        endpoint = self.getDbPathOrUrl()
+        with sqlite3.connect(self.textIndexPath) as con:
+            self.createJournalTextIndex(con)
+            if replace:
+                con.execute("DELETE FROM JournalText WHERE endpoint = ?;", (endpoint,))
+            con.executemany("INSERT OR IGNORE INTO JournalText (endpoint, subject, title, publisher) VALUES (?, ?, ?, ?);", 
+                            zip([endpoint] * len(journals), subjects.str.strip("<>"), journals["title"], journals["publisher"]))
+            con.commit()
+
+    def createJournalTextIndex(self, con: sqlite3.Connection):
+        # an FTS5 trigram index over the JournalText rows, kept up to date by the triggers, so that any 
+        # substring of 3 characters or more is found without scanning the titles
+        con.executescript("""
+            CREATE TABLE IF NOT EXISTS JournalText (
+                id INTEGER PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                title TEXT NOT NULL,
+                publisher TEXT NOT NULL,
+                UNIQUE (endpoint, subject, title, publisher)
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS JournalTextIndex USING fts5(
+                title, publisher, content='JournalText', content_rowid='id', tokenize='trigram'
+            );
+            CREATE TRIGGER IF NOT EXISTS JournalTextInserted AFTER INSERT ON JournalText BEGIN
+                INSERT INTO JournalTextIndex (rowid, title, publisher) VALUES (new.id, new.title, new.publisher);
+            END;
+            CREATE TRIGGER IF NOT EXISTS JournalTextDeleted AFTER DELETE ON JournalText BEGIN
+                INSERT INTO JournalTextIndex (JournalTextIndex, rowid, title, publisher) VALUES ('delete', old.id, old.title, old.publisher);
+            END;
+        """)
     
-    def pushDataToDb(self, path: str) -> bool: 
-        jou_graph = self.createJournalGraph(path)
+    def pushDataToDb(self, path: str) -> bool:
+        # a full upload may rewrite journals already in the store (the same subjects) as well as add new ones, so 
+        # its own counts are not the store's: they are dropped, and only a delta upload records the exact ones
+        self.recordStatistics(None)
+        try:
+            if self.manifestPath is not None:
+                return self.pushDeltaToDb(path)
+            if self.chunkSize is not None:
+                return self.streamDataToDb(path)
+            try:
+                journals = self.readJournalCsv(path)
+                ntriples = self.createJournalNTriples(journals)
+            except Exception as e:
+                print(f"Error during pushDataToDb (CSV to Blazegraph): {e}")
+                return False
+            if not self.pushTriplesToDb(ntriples, len(ntriples)):
+                return False
+            try:
+                self.writeJournalText(journals, self.createJournalSubjects(journals))
+            except sqlite3.Error as e:
+                print(f"SQLite error during pushDataToDb (text index): {e}")
+                return False
+            return True
+        finally:
+            self.markDataChanged() # even a failed upload may have sent some of the batches
+
+    def pushDeltaToDb(self, path: str) -> bool:
+        # delta mode: journals get ISSN-based IRIs and a content hash stored in the manifest, so only the
+        # journals added, changed or removed since the previous upload to this endpoint are sent
+        endpoint = self.getDbPathOrUrl()
+        try:
+            journals = self.readJournalCsv(path)
+            ntriples = [[line for line in lines if line] 
+                        for lines in self.createJournalNTriplesTable(journals, stable_ids=True)]
+            subjects = self.createJournalSubjects(journals, stable_ids=True).to_numpy(dtype=object)
+            hashes = [hashlib.sha1("\n".join(lines).encode("utf-8")).hexdigest() for lines in ntriples]
+            
+            new_hashes = {} 
+            new_lines = {}
+            for subject, journal_hash, lines in zip(subjects, hashes, ntriples):
+                if subject not in new_hashes: # duplicated ISSNs: the first row wins
+                    new_hashes[subject] = journal_hash
+                    new_lines[subject] = lines
+
+            with sqlite3.connect(self.manifestPath) as con:
+                con.execute("""
+                    CREATE TABLE IF NOT EXISTS JournalManifest (
+                        endpoint TEXT NOT NULL,
+                        subject TEXT NOT NULL,
+                        hash TEXT NOT NULL,
+                        PRIMARY KEY (endpoint, subject)
+                    );
+                """)
+                old_hashes = dict(con.execute("SELECT subject, hash FROM JournalManifest WHERE endpoint = ?;", (endpoint,)))
+        except Exception as e:
+            print(f"Error during pushDataToDb (CSV to Blazegraph): {e}")
+            return False
+
+        added = [subject for subject in new_hashes if subject not in old_hashes]
+        changed = [subject for subject in new_hashes if subject in old_hashes and old_hashes[subject] != new_hashes[subject]]
+        removed = [subject for subject in old_hashes if subject not in new_hashes]
+        print(f"Delta upload to {endpoint}: {len(added)} added, {len(changed)} changed, {len(removed)} removed journals")
+
+        try:
+            outdated = changed + removed
+            if outdated:
+                store = self.openStore()
+                try:
+                    subjects_per_request = max(1, self.batchSize // 10)
+                    for start in range(0, len(outdated), subjects_per_request):
+                        values = " ".join(outdated[start:start + subjects_per_request])
+                        store.update(f"DELETE {{ ?s ?p ?o }} WHERE {{ VALUES ?s {{ {values} }} ?s ?p ?o . }}")
+                finally:
+                    store.close()
+        except Exception as e:
+            print(f"Error during pushDataToDb (CSV to Blazegraph): {e}")
+            return False
+
+        upserted = added + changed
+        triples = (line for subject in upserted for line in new_lines[subject])
+        if upserted and not self.pushTriplesToDb(triples, sum(len(new_lines[subject]) for subject in upserted)):
+            return False
+
+        try: # the manifest only moves forward once the store is up to date
+            with sqlite3.connect(self.manifestPath) as con:
+                con.executemany("DELETE FROM JournalManifest WHERE endpoint = ? AND subject = ?;", 
+                                [(endpoint, subject) for subject in removed])
+                con.executemany("INSERT OR REPLACE INTO JournalManifest (endpoint, subject, hash) VALUES (?, ?, ?);", 
+                                [(endpoint, subject, new_hashes[subject]) for subject in upserted])
+                con.commit()
+        except sqlite3.Error as e:
+            print(f"SQLite error during pushDataToDb (manifest): {e}")
+            return False
+
+        # the store now holds exactly the journals of this file
+        first_rows = ~pd.Series(subjects).duplicated().to_numpy()
+        try: # rewritten as a whole: local, and complete even when the index is newer than the manifest
+            self.writeJournalText(journals[first_rows], pd.Series(subjects[first_rows]), replace=True)
+        except sqlite3.Error as e:
+            print(f"SQLite error during pushDataToDb (text index): {e}")
+            return False
+        self.recordStatistics(countJournalStatistics(journals[first_rows]))
+        return True
+
+    def streamDataToDb(self, path: str) -> bool:
+        # producer/consumer pipeline: a thread parses the CSV chunk by chunk into a bounded queue while 
+        # this thread uploads, so parsing and network I/O overlap and memory is bounded by the queue size
+        chunks = queue.Queue(maxsize=self.queueSize)
+        stop = threading.Event()
+        end_of_file = object()
+        text_dfs = [] # only indexed once the triples are in the store, as in pushDataToDb
+
+        def produce():
+            try:
+                for journals in self.readJournalCsv(path, self.chunkSize):
+                    item = self.createJournalNTriples(journals)
+                    if self.textIndexPath is not None:
+                        text_dfs.append(journals[["title", "publisher"]].assign(subject=self.createJournalSubjects(journals)))
+                    while not stop.is_set():
+                        try:
+                            chunks.put(item, timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop.is_set():
+                        return
+                item = end_of_file
+            except Exception as e:
+                item = e
+            while not stop.is_set(): # handing over the end of the file (or the error) to the consumer
+                try:
+                    chunks.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def consume():
+            while True:
+                item = chunks.get()
+                if item is end_of_file:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield from item
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            if not self.pushTriplesToDb(consume()):
+                return False
+        finally:
+            stop.set()
+            producer.join()
+        if text_dfs:
+            try:
+                text_df = pd.concat(text_dfs, ignore_index=True)
+                self.writeJournalText(text_df, text_df["subject"])
+            except sqlite3.Error as e:
+                print(f"SQLite error during pushDataToDb (text index): {e}")
+                return False
+        return True
+
+    def pushTriplesToDb(self, triples: Iterable[str], total: Optional[int] = None) -> bool:
+        # sends N-Triples lines in INSERT DATA batches instead of one HTTP request per triple
         try:
-            store = SPARQLUpdateStore()
-            endpoint = self.getDbPathOrUrl()
-            store.open((endpoint, endpoint))
-            for triple in jou_graph.triples((None, None, None)):
-                store.add(triple)
-            store.close()
+            store = self.openStore()
+            try:
+                sent = 0
+                batch = []
+                for triple in triples:
+                    batch.append(triple)
+                    if len(batch) >= self.batchSize:
+                        sent = self.sendBatch(store, batch, sent, total)
+                        batch = []
+                if batch:
+                    sent = self.sendBatch(store, batch, sent, total)
+            finally: # a failed batch must not leave the store connection open
+                store.close()
             return True
         except Exception as e:
             print(f"Error during pushDataToDb (CSV to Blazegraph): {e}")
             return False
 
+    def openStore(self) -> SPARQLUpdateStore | EmbeddedRDFStore:
+        endpoint = self.getDbPathOrUrl()
+        if isEmbeddedStore(endpoint):
+            return getEmbeddedStore(endpoint)
+        store = SPARQLUpdateStore()
+        store.open((endpoint, endpoint))
+        return store
+
+    def sendBatch(self, store: SPARQLUpdateStore | EmbeddedRDFStore, batch: list[str], sent: int, total: Optional[int]) -> int:
+        if isinstance(store, EmbeddedRDFStore):
+            store.insertTriples(batch)
+        else:
+            store.update("INSERT DATA {\n" + "\n".join(batch) + "\n}")
+        sent += len(batch)
+        print(f"Uploaded {sent}{'/' + str(total) if total is not None else ''} triples to {self.getDbPathOrUrl()}")
+        return sent
+
 class CategoryUploadHandler(UploadHandler): 
+    def __init__(self):
+        super().__init__()
+        self.chunkSize = None # journals parsed at a time from the JSON in streaming mode, None to load the whole file
+        self.normalisedSchema = False # one flat Category table (False) or indexed journal/category/area tables (True)
+
+    def getChunkSize(self) -> Optional[int]:
+        return self.chunkSize
+
+    def setChunkSize(self, chunkSize: Optional[int]) -> bool:
+        if chunkSize is not None and (not isinstance(chunkSize, int) or isinstance(chunkSize, bool) or chunkSize < 1):
+            return False
+        self.chunkSize = chunkSize
+        return True
+
+    def getNormalisedSchema(self) -> bool:
+        return self.normalisedSchema
+
+    def setNormalisedSchema(self, normalisedSchema: bool) -> bool:
+        if not isinstance(normalisedSchema, bool):
+            return False
+        self.normalisedSchema = normalisedSchema
+        return True
+
     def createCategoryDataframe(self, json_file: str) -> pd.DataFrame: # Ila
+        if self.chunkSize is not None:
+            return pd.concat(self.iterCategoryDataframes(json_file), ignore_index=True)
         with open(json_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
-            json_df = pd.DataFrame(data) 
-
-            df_identifiers = json_df[["identifiers"]] 
-            internal_ids = []
-            for idx, row in df_identifiers.iterrows():
-                internal_ids.append("cat-" + str(idx)) 
-
-            json_df.insert(0, "internal-id", pd.Series(internal_ids, dtype="string")) 
-            json_df = json_df.rename(columns={"identifiers": "journal-ids"}) 
-
-            rows = []
-            for _, row in json_df.iterrows():
-                journal_ids = row["journal-ids"]  
-                internal_id = row["internal-id"] 
-                categories = row["categories"]
-                areas = row["areas"]
-
-                for cat in categories: 
-                    for area in areas: 
-                        rows.append({
-                            "internal-id": internal_id,  
-                            "journal-ids": ', '.join(journal_ids),  
-                            "category": cat["id"],  
-                            "quartile": cat.get("quartile", None), 
-                            "area": area
-                        })
-
-            categories_df = pd.DataFrame(rows)
-            return categories_df 
+        return self.explodeCategoryRecords(data)
+
+    def iterCategoryDataframes(self, json_file: str) -> Iterator[pd.DataFrame]:
+        start = 0
+        for records in self.iterJsonRecords(json_file, self.chunkSize or 10000):
+            yield self.explodeCategoryRecords(records, start)
+            start += len(records)
+
+    def explodeCategoryRecords(self, records: list[dict], start: int = 0) -> pd.DataFrame:
+        # one row per journal x category x area, built with explode instead of nested loops
+        json_df = pd.DataFrame(records, columns=["identifiers", "categories", "areas"]) 
+        json_df.index = pd.RangeIndex(start, start + len(json_df))
+
+        categories_df = pd.DataFrame({
+            "internal-id": pd.Series("cat-" + json_df.index.astype(str), index=json_df.index, dtype="string"),
+            "journal-ids": json_df["identifiers"].str.join(", "),
+            "category": json_df["categories"],
+            "area": json_df["areas"]
+        })
+        categories_df = categories_df.explode("category").explode("area")
+        categories_df = categories_df.dropna(subset=["category", "area"]) # journals without categories or areas have no rows
+
+        categories_df["quartile"] = categories_df["category"].str.get("quartile")
+        categories_df["category"] = categories_df["category"].str.get("id")
+        categories_df["quartile"] = categories_df["quartile"].astype(object).where(categories_df["quartile"].notna(), None)
+        return categories_df[["internal-id", "journal-ids", "category", "quartile", "area"]].reset_index(drop=True)
+
+    def iterJsonRecords(self, json_file: str, chunk_size: int, read_size: int = 1 << 20) -> Iterator[list[dict]]:
+        # incremental parsing of a top-level JSON array: only the current read buffer and one chunk of records are in memory
+        decoder = json.JSONDecoder()
+        cut_off_pattern = re.compile(r'[^\s,\]}]*') # a token running up to the end of the buffer
+        with open(json_file, 'r', encoding='utf-8') as f:
+            buffer = f.read(read_size).lstrip()
+            if not buffer.startswith("["):
+                raise ValueError(f"Expected a JSON array in {json_file!r}")
+            position = 1
+            records = []
+            end_of_file = False
+            while True:
+                while position < len(buffer) and buffer[position] in " \t\r\n,":
+                    position += 1
+                if position < len(buffer) and buffer[position] == "]":
+                    break
+                try:
+                    if position >= len(buffer):
+                        raise json.JSONDecodeError("Incomplete record", buffer, position)
+                    record, position = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError as e:
+                    # only a record cut off by the end of the buffer is worth reading more for; an error followed 
+                    # by more JSON text is malformed input and is raised without reading the rest of the file
+                    cut_off = e.msg.startswith("Unterminated string") or cut_off_pattern.fullmatch(buffer, e.pos)
+                    if end_of_file or not cut_off:
+                        raise
+                    more = f.read(read_size)
+                    end_of_file = not more
+                    buffer = buffer[position:] + more
+                    position = 0
+                    continue
+                records.append(record)
+                if len(records) >= chunk_size:
+                    yield records
+                    records = []
+            if records:
+                yield records
+    
+    def dropNormalisedSchema(self, con: sqlite3.Connection):
+        # the flat table and the normalised one share the name "Category", so the other layout is always cleared first
+        con.executescript("""
+            DROP TABLE IF EXISTS JournalArea;
+            DROP TABLE IF EXISTS JournalCategory;
+            DROP TABLE IF EXISTS JournalIdentifier;
+            DROP TABLE IF EXISTS Journal;
+            DROP TABLE IF EXISTS Area;
+            DROP TABLE IF EXISTS Category;
+        """)
+
+    def createFlatIndexes(self, con: sqlite3.Connection):
+        # case-insensitive lookups in CategoryQueryHandler compare with COLLATE NOCASE, which these indexes serve
+        con.executescript("""
+            CREATE INDEX IF NOT EXISTS CategoryByCategory ON Category (category COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS CategoryByArea ON Category (area COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS CategoryByJournalIds ON Category ("journal-ids" COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS CategoryByQuartile ON Category (quartile);
+        """)
+
+    def createNormalisedSchema(self, con: sqlite3.Connection):
+        self.dropNormalisedSchema(con)
+        con.executescript("""
+            CREATE TABLE Journal (
+                journal_id INTEGER PRIMARY KEY,
+                internal_id TEXT NOT NULL UNIQUE,
+                journal_ids TEXT NOT NULL
+            );
+            CREATE TABLE JournalIdentifier (
+                identifier TEXT NOT NULL,
+                journal_id INTEGER NOT NULL REFERENCES Journal (journal_id),
+                PRIMARY KEY (identifier, journal_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX JournalIdentifierByJournal ON JournalIdentifier (journal_id);
+
+            CREATE INDEX JournalIdentifierByIdentifier ON JournalIdentifier (identifier COLLATE NOCASE);
+
+            CREATE TABLE Category (
+                category_id INTEGER PRIMARY KEY,
+                category TEXT NOT NULL UNIQUE
+            );
+            CREATE INDEX CategoryByName ON Category (category COLLATE NOCASE);
+            CREATE TABLE Area (
+                area_id INTEGER PRIMARY KEY,
+                area TEXT NOT NULL UNIQUE
+            );
+            CREATE INDEX AreaByName ON Area (area COLLATE NOCASE);
+
+            CREATE TABLE JournalCategory (
+                journal_id INTEGER NOT NULL REFERENCES Journal (journal_id),
+                category_id INTEGER NOT NULL REFERENCES Category (category_id),
+                quartile TEXT
+            );
+            CREATE INDEX JournalCategoryByJournal ON JournalCategory (journal_id);
+            CREATE INDEX JournalCategoryByCategory ON JournalCategory (category_id, quartile);
+            CREATE INDEX JournalCategoryByQuartile ON JournalCategory (quartile);
+
+            CREATE TABLE JournalArea (
+                journal_id INTEGER NOT NULL REFERENCES Journal (journal_id),
+                area_id INTEGER NOT NULL REFERENCES Area (area_id),
+                PRIMARY KEY (journal_id, area_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX JournalAreaByArea ON JournalArea (area_id);
+
+            CREATE TEMP TABLE IF NOT EXISTS CategoryStaging (
+                internal_id TEXT, journal_ids TEXT, category TEXT, quartile TEXT, area TEXT
+            );
+            CREATE TEMP TABLE IF NOT EXISTS IdentifierStaging (internal_id TEXT, identifier TEXT);
+        """)
+
+    def writeStatistics(self, con: sqlite3.Connection):
+        # number of journals per category, area and quartile (NULL for no quartile), read by CategoryQueryHandler.getStatistics
+        con.execute("CREATE TABLE IF NOT EXISTS Statistics (kind TEXT NOT NULL, value TEXT, count INTEGER NOT NULL);")
+        con.execute("DELETE FROM Statistics;")
+        if self.normalisedSchema:
+            con.execute("""
+                INSERT INTO Statistics (kind, value, count)
+                SELECT 'journals', NULL, COUNT(*) FROM Journal
+                UNION ALL
+                SELECT 'category', c.category, COUNT(DISTINCT jc.journal_id) 
+                FROM JournalCategory jc JOIN Category c ON c.category_id = jc.category_id GROUP BY c.category_id
+                UNION ALL
+                SELECT 'area', a.area, COUNT(DISTINCT ja.journal_id) 
+                FROM JournalArea ja JOIN Area a ON a.area_id = ja.area_id GROUP BY a.area_id
+                UNION ALL
+                SELECT 'quartile', quartile, COUNT(DISTINCT journal_id) FROM JournalCategory GROUP BY quartile;
+            """)
+        else:
+            con.execute("""
+                INSERT INTO Statistics (kind, value, count)
+                SELECT 'journals', NULL, COUNT(DISTINCT "internal-id") FROM Category
+                UNION ALL
+                SELECT 'category', category, COUNT(DISTINCT "internal-id") FROM Category GROUP BY category
+                UNION ALL
+                SELECT 'area', area, COUNT(DISTINCT "internal-id") FROM Category GROUP BY area
+                UNION ALL
+                SELECT 'quartile', quartile, COUNT(DISTINCT "internal-id") FROM Category GROUP BY quartile;
+            """)
+
+    def insertNormalisedRows(self, con: sqlite3.Connection, categories_df: pd.DataFrame):
+        # the flat rows of a chunk go through temporary staging tables, so the category and area ids
+        # stay consistent across chunks
+        identifiers_df = categories_df[["internal-id", "journal-ids"]].drop_duplicates()
+        identifiers_df = identifiers_df.assign(identifier=identifiers_df["journal-ids"].str.split(", ")).explode("identifier")
+        identifiers_df = identifiers_df[identifiers_df["identifier"].notna() & (identifiers_df["identifier"] != "")]
+
+        con.execute("DELETE FROM CategoryStaging;")
+        con.execute("DELETE FROM IdentifierStaging;")
+        con.executemany("INSERT INTO CategoryStaging VALUES (?, ?, ?, ?, ?);", 
+                        categories_df[["internal-id", "journal-ids", "category", "quartile", "area"]].itertuples(index=False, name=None))
+        con.executemany("INSERT INTO IdentifierStaging VALUES (?, ?);", 
+                        identifiers_df[["internal-id", "identifier"]].itertuples(index=False, name=None))
+        con.executescript("""
+            INSERT INTO Journal (internal_id, journal_ids)
+                SELECT internal_id, journal_ids FROM CategoryStaging GROUP BY internal_id ORDER BY MIN(rowid);
+            INSERT OR IGNORE INTO Category (category)
+                SELECT category FROM CategoryStaging GROUP BY category ORDER BY MIN(rowid);
+            INSERT OR IGNORE INTO Area (area)
+                SELECT area FROM CategoryStaging GROUP BY area ORDER BY MIN(rowid);
+            INSERT OR IGNORE INTO JournalIdentifier (identifier, journal_id)
+                SELECT DISTINCT s.identifier, j.journal_id
+                FROM IdentifierStaging s JOIN Journal j ON j.internal_id = s.internal_id;
+            INSERT INTO JournalCategory (journal_id, category_id, quartile)
+                SELECT DISTINCT j.journal_id, c.category_id, s.quartile
+                FROM CategoryStaging s 
+                JOIN Journal j ON j.internal_id = s.internal_id
+                JOIN Category c ON c.category = s.category;
+            INSERT OR IGNORE INTO JournalArea (journal_id, area_id)
+                SELECT DISTINCT j.journal_id, a.area_id
+                FROM CategoryStaging s 
+                JOIN Journal j ON j.internal_id = s.internal_id
+                JOIN Area a ON a.area = s.area;
+        """)
     
     def pushDataToDb(self, path: str) -> bool: 
-        categories_df = self.createCategoryDataframe(path)
-
         absolute_path = os.path.abspath(path) 
         if not os.path.exists(absolute_path):
             return False
         
         try:
             with sqlite3.connect(self.dbPathOrUrl) as con:
-                categories_df.to_sql("Category", con, if_exists="replace", index=False)
+                con.execute("PRAGMA journal_mode = WAL;") # readers keep their pooled connections while the upload writes
+                if self.chunkSize is None:
+                    categories_dfs = [self.createCategoryDataframe(path)]
+                else:
+                    categories_dfs = self.iterCategoryDataframes(path)
+
+                if self.normalisedSchema:
+                    self.createNormalisedSchema(con)
+                    for categories_df in categories_dfs:
+                        self.insertNormalisedRows(con, categories_df)
+                    con.execute("ANALYZE;")
+                else:
+                    self.dropNormalisedSchema(con)
+                    if_exists = "replace" 
+                    for categories_df in categories_dfs:
+                        categories_df.to_sql("Category", con, if_exists=if_exists, index=False)
+                        if_exists = "append"
+                    if if_exists == "replace": # empty array
+                        self.explodeCategoryRecords([]).to_sql("Category", con, if_exists="replace", index=False)
+                    self.createFlatIndexes(con)
+                self.writeStatistics(con)
                 con.commit()
             return True
         except sqlite3.Error as e: 
@@ -294,10 +1382,144 @@ class CategoryUploadHandler(UploadHandler):
         except Exception as e: 
             print(f"Unexpected error during pushDataToDb (JSON): {e}")
             return False
+        finally:
+            self.markDataChanged()
+
+class SQLiteConnectionPool:
+    # small pool of read-only connections; sqlite3 keeps a per-connection cache of prepared statements,
+    # so reusing the connections also reuses the compiled queries
+    def __init__(self, path: str, size: int = 4, cacheSizeKiB: int = 16384):
+        self.path = path
+        self.size = size
+        self.cacheSizeKiB = cacheSizeKiB
+        self.idle = queue.LifoQueue()
+        self.opened = 0
+        self.closed = False # connections given back to a closed pool are closed instead of kept
+        self.lock = threading.Lock()
+
+    def connect(self) -> sqlite3.Connection:
+        uri = "file:" + urllib.parse.quote(os.path.abspath(self.path)) + "?mode=ro"
+        con = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=256)
+        con.execute(f"PRAGMA cache_size = -{self.cacheSizeKiB};")
+        con.execute("PRAGMA query_only = ON;")
+        return con
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        if self.closed:
+            raise sqlite3.ProgrammingError("Cannot use a closed connection pool.")
+        try:
+            con = self.idle.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                can_open = self.opened < self.size
+                if can_open:
+                    self.opened += 1
+            if can_open:
+                try:
+                    con = self.connect()
+                except Exception:
+                    with self.lock:
+                        self.opened -= 1
+                    raise
+            else: # waiting for another thread to give one back
+                while True:
+                    try:
+                        con = self.idle.get(timeout=0.1)
+                        break
+                    except queue.Empty:
+                        if self.closed:
+                            raise sqlite3.ProgrammingError("Cannot use a closed connection pool.")
+        try:
+            yield con
+        finally:
+            with self.lock:
+                closed = self.closed
+                if not closed:
+                    self.idle.put(con)
+            if closed:
+                con.close()
+
+    def close(self):
+        # the idle connections are closed now, the ones in use as soon as they are given back
+        with self.lock:
+            self.closed = True
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+class SPARQLSession:
+    # keep-alive HTTP connections (one per thread and host) asking for gzip-compressed responses
+    def __init__(self, timeout: float = 300):
+        self.timeout = timeout
+        self.local = threading.local()
+        self.opened: list[http.client.HTTPConnection] = []
+        self.lock = threading.Lock()
+
+    def getConnection(self, url: urllib.parse.SplitResult) -> http.client.HTTPConnection:
+        if not hasattr(self.local, "connections"):
+            self.local.connections = {}
+        key = (url.scheme, url.netloc)
+        if key not in self.local.connections:
+            connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+            connection = connection_class(url.netloc, timeout=self.timeout)
+            self.local.connections[key] = connection
+            with self.lock:
+                self.opened.append(connection)
+        return self.local.connections[key]
+
+    def post(self, url: str, body: bytes, headers: dict[str, str]) -> bytes:
+        parts = urllib.parse.urlsplit(url)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        headers = {"Accept-Encoding": "gzip", "Connection": "keep-alive", **headers}
+
+        for attempt in range(2): # the server may have closed an idle connection in the meantime
+            connection = self.getConnection(parts)
+            try:
+                connection.request("POST", path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except (ConnectionError, http.client.HTTPException):
+                connection.close()
+                if attempt:
+                    raise
+
+        if response.getheader("Content-Encoding", "").lower() == "gzip":
+            data = gzip.decompress(data)
+        if response.status >= 400:
+            raise ConnectionError(f"HTTP {response.status} {response.reason}: {data[:200].decode('utf-8', 'replace')}")
+        return data
+
+    def close(self):
+        with self.lock:
+            for connection in self.opened:
+                connection.close()
+            self.opened = []
+        self.local = threading.local()
+
+class AsyncSPARQLSession:
+    # asyncio front of SPARQLSession: the requests run on a dedicated executor, each thread with its own keep-alive 
+    # connections, so the HTTP handling stays with http.client and the event loop never waits for the network
+    def __init__(self, timeout: float = 300, maxConnections: int = 32):
+        self.session = SPARQLSession(timeout)
+        self.maxConnections = maxConnections
+        self.executor = ThreadPoolExecutor(max_workers=maxConnections, thread_name_prefix="AsyncSPARQLSession")
+
+    async def post(self, url: str, body: bytes, headers: dict[str, str]) -> bytes:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.session.post, url, body, headers)
+
+    async def close(self):
+        self.executor.shutdown(wait=False)
+        self.executor = ThreadPoolExecutor(max_workers=self.maxConnections, thread_name_prefix="AsyncSPARQLSession")
+        self.session.close()
 
 class QueryHandler(Handler): 
     def __init__(self):
         super().__init__()
+        self.errorCount = 0 # failed queries, as the methods return an empty DataFrame instead of raising
     
     @property
     def queryType(self) -> str: # used for handling exceptions of different types
@@ -310,54 +1532,204 @@ class QueryHandler(Handler):
         stack_frame = currentframe().f_back
         function_name = stack_frame.f_code.co_name
         print(f"Unexpected error during {function_name!r} ({self.queryType}) [{type(e).__name__}]: {e}")
+        self.errorCount += 1
+
+    def getErrorCount(self) -> int:
+        return self.errorCount
 
 class CategoryQueryHandler(QueryHandler):
     def __init__(self):
         super().__init__()
+        self.connectionPool: Optional[SQLiteConnectionPool] = None
+        self.poolSize = 4
+        self.normalisedSchema = None # ((path, data version), whether the database uses the normalised schema)
     
     @property
     def queryType(self) -> str:
         return "SQLite"
+
+    def setDbPathOrUrl(self, pathOrUrl: str) -> bool:
+        if pathOrUrl == self.dbPathOrUrl:
+            return True
+        if not super().setDbPathOrUrl(pathOrUrl):
+            return False
+        self.close() # the pool belongs to the previous database
+        return True
+
+    def close(self):
+        if self.connectionPool is not None:
+            self.connectionPool.close()
+            self.connectionPool = None
+
+    def getConnection(self) -> AbstractContextManager[sqlite3.Connection]:
+        # read-only connections are opened once and reused by every query of this handler
+        if self.connectionPool is None:
+            self.connectionPool = SQLiteConnectionPool(self.getDbPathOrUrl(), self.poolSize)
+        return self.connectionPool.connection()
+
+    def fetchRows(self, con: sqlite3.Connection, query: str, params: Iterable | dict = ()) -> list[dict]:
+        # light path for lookups returning a handful of rows: no DataFrame is built
+        cursor = con.execute(query, params)
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, values)) for values in cursor.fetchall()]
+
+    def fetchFrame(self, con: sqlite3.Connection, query: str, params: Iterable | dict = ()) -> pd.DataFrame:
+        cursor = con.execute(query, params)
+        columns = [description[0] for description in cursor.description]
+        return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+
+    def hasNormalisedSchema(self, con: sqlite3.Connection) -> bool:
+        # databases written with CategoryUploadHandler.setNormalisedSchema(True) have a JournalCategory table;
+        # checked again after each upload made through this process
+        key = (self.getDbPathOrUrl(), getDataVersion(self.getDbPathOrUrl()))
+        if self.normalisedSchema is None or self.normalisedSchema[0] != key:
+            query = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'JournalCategory';"
+            self.normalisedSchema = (key, con.execute(query).fetchone() is not None)
+        return self.normalisedSchema[1]
+
+    def getCategoryAreaSource(self, con: sqlite3.Connection) -> str:
+        # (area, category) pairs of the same journal, in either schema
+        if self.hasNormalisedSchema(con):
+            return """(
+                SELECT a.area AS area, c.category AS category
+                FROM JournalArea ja
+                JOIN Area a ON a.area_id = ja.area_id
+                JOIN JournalCategory jc ON jc.journal_id = ja.journal_id
+                JOIN Category c ON c.category_id = jc.category_id
+            )"""
+        return "Category"
     
     def getById(self, id: str) -> pd.DataFrame: # * Nico
-        journal_id_pattern = re.compile(r'^\d{4}-\d{3,4}X?(, \d{4}-\d{3,4}X?)*$')
-
-        if not journal_id_pattern.match(id): 
-            entity_types = ["category", "area", "journal-ids"] 
-            for entity_type in entity_types:
-                object_df = self.getCategoryObjectsById(id, entity_type)
-                if not object_df.empty:
-                    return self.createCategoryObject(object_df, entity_type) 
-            
-        else: # for matching journal ids to their categories and quartiles
-            possible_journal_ids = [id] + id.split(", ") # Ila
-            for journal_id in possible_journal_ids:
-                journal_ids_df = self.getCategoryObjectsById(journal_id, "journal-ids")
-                if not journal_ids_df.empty:
-                    return self.createCategoryObject(journal_ids_df, "journal")
+        try:
+            with self.getConnection() as con:
+                entity_rows, journal_rows = self.matchIds(con, [id])
+            match = self.resolveId(id, entity_rows, journal_rows)
+            if match is not None:
+                entity_type, values = match
+                return pd.DataFrame([values])
+        except Exception as e:
+            self.unexpectedDatabaseError(e)
     
         return pd.DataFrame()
+
+    def getByIds(self, ids: Iterable[str]) -> pd.DataFrame:
+        # bulk version of getById: all the ids are matched with (at most) two queries, the result has one row 
+        # per id that was found, indexed by the input id, with an "entity-type" column (journal, category or area)
+        ids = list(dict.fromkeys(ids))
+        columns = ["entity-type", "journal-ids", "categories-with-quartiles", "areas", "category", "quartile", "area"]
+        try:
+            with self.getConnection() as con:
+                entity_rows, journal_rows = self.matchIds(con, ids)
+        except Exception as e:
+            self.unexpectedDatabaseError(e)
+            return pd.DataFrame(columns=columns)
+
+        found_ids = []
+        records = []
+        for id in ids:
+            match = self.resolveId(id, entity_rows, journal_rows)
+            if match is not None:
+                entity_type, values = match
+                found_ids.append(id)
+                records.append(dict.fromkeys(columns) | {"entity-type": entity_type} | values)
+        # object columns, so that missing values stay None as in getById
+        return pd.DataFrame(records, columns=columns, index=pd.Index(found_ids, name="id", dtype=object), dtype=object)
+
+    def matchIds(self, con: sqlite3.Connection, ids: list[str]) -> tuple[dict[str, list[dict]], dict[str, list[dict]]]:
+        # rows matching each id, grouped by the id (or journal id candidate) they matched
+        journal_id_pattern = re.compile(r'^\d{4}-\d{3,4}X?(, \d{4}-\d{3,4}X?)*$')
+        entity_ids = [id for id in ids if not journal_id_pattern.match(id)]
+        journal_ids = [id for id in ids if journal_id_pattern.match(id)]
+
+        entity_rows = {}
+        if entity_ids: # one indexed query for both entity types, the "entity-type" column says which one matched
+            for row in self.fetchRows(con, self.getEntityMatchQuery(con), {"ids": json.dumps(entity_ids)}):
+                entity_rows.setdefault(row["matched-id"], []).append(row)
+
+        journal_rows = {}
+        if journal_ids: 
+            possible_journal_ids = list(dict.fromkeys(journal_id for id in journal_ids for journal_id in [id] + id.split(", "))) # Ila
+            for row in self.fetchRows(con, self.getJournalMatchQuery(con), {"ids": json.dumps(possible_journal_ids)}):
+                journal_rows.setdefault(row["matched-id"], []).append(row)
+        return entity_rows, journal_rows
+
+    def resolveId(self, id: str, entity_rows: dict[str, list[dict]], journal_rows: dict[str, list[dict]]) -> Optional[tuple[str, dict]]:
+        journal_id_pattern = re.compile(r'^\d{4}-\d{3,4}X?(, \d{4}-\d{3,4}X?)*$')
+        if not journal_id_pattern.match(id):
+            matches = entity_rows.get(id, [])
+            for entity_type in ["category", "area"]: # categories win over areas with the same name
+                object_rows = [row for row in matches if row["entity-type"] == entity_type]
+                if object_rows:
+                    return entity_type, self.createCategoryValues(object_rows, entity_type)
+        else: # for matching journal ids to their categories and quartiles
+            for journal_id in [id] + id.split(", "): # keeping the priority of the candidates
+                if journal_rows.get(journal_id):
+                    return "journal", self.createCategoryValues(journal_rows[journal_id], "journal")
+        return None
+
+    def getEntityMatchQuery(self, con: sqlite3.Connection) -> str:
+        if self.hasNormalisedSchema(con):
+            return """
+                SELECT DISTINCT input.value AS "matched-id", 'category' AS "entity-type", c.category AS category, jc.quartile AS quartile, NULL AS area
+                FROM json_each(:ids) AS input
+                JOIN Category c ON c.category = input.value COLLATE NOCASE
+                LEFT JOIN JournalCategory jc ON jc.category_id = c.category_id
+                UNION ALL
+                SELECT input.value, 'area', NULL, NULL, a.area
+                FROM json_each(:ids) AS input
+                JOIN Area a ON a.area = input.value COLLATE NOCASE;
+            """
+        return """
+            SELECT DISTINCT input.value AS "matched-id", 'category' AS "entity-type", c.category, c.quartile, NULL AS area
+            FROM json_each(:ids) AS input
+            JOIN Category c ON c.category = input.value COLLATE NOCASE
+            UNION ALL
+            SELECT DISTINCT input.value, 'area', NULL, NULL, c.area
+            FROM json_each(:ids) AS input
+            JOIN Category c ON c.area = input.value COLLATE NOCASE;
+        """
+
+    def getJournalMatchQuery(self, con: sqlite3.Connection) -> str:
+        if self.hasNormalisedSchema(con):
+            return """
+                SELECT input.value AS "matched-id", j.journal_ids AS "journal-ids", c.category, jc.quartile, a.area
+                FROM json_each(:ids) AS input
+                JOIN JournalIdentifier ji ON ji.identifier = input.value COLLATE NOCASE
+                JOIN Journal j ON j.journal_id = ji.journal_id
+                JOIN JournalCategory jc ON jc.journal_id = j.journal_id
+                JOIN Category c ON c.category_id = jc.category_id
+                JOIN JournalArea ja ON ja.journal_id = j.journal_id
+                JOIN Area a ON a.area_id = ja.area_id;
+            """
+        return """
+            SELECT DISTINCT input.value AS "matched-id", c.*
+            FROM json_each(:ids) AS input
+            JOIN Category c ON c."journal-ids" = input.value COLLATE NOCASE;
+        """
     
-    def createCategoryObject(self, target_df: pd.DataFrame, entity_type: str) -> pd.Series:  
+    def createCategoryObject(self, target_df: pd.DataFrame | list[dict], entity_type: str) -> pd.DataFrame:  
+        # accepts a data frame or the plain rows returned by fetchRows
+        rows = target_df.to_dict("records") if isinstance(target_df, pd.DataFrame) else target_df
+        if entity_type not in ("journal", "area", "category"):
+            return pd.DataFrame()
+        return pd.DataFrame([self.createCategoryValues(rows, entity_type)])
+
+    def createCategoryValues(self, rows: list[dict], entity_type: str) -> dict:
         if entity_type == "journal":
             categories_with_quartiles = {}
             areas = set()
-            for _, row in target_df.iterrows():
+            for row in rows:
                 categories_with_quartiles[row["category"]] = row.get("quartile")
                 areas.add(row.get("area"))
-
-            journal_category_values = [target_df.iloc[0]["journal-ids"], categories_with_quartiles, areas]
-            journal_category_data = pd.DataFrame([journal_category_values], columns=["journal-ids", "categories-with-quartiles", "areas"])
-            return journal_category_data
+            return {"journal-ids": rows[0]["journal-ids"], "categories-with-quartiles": categories_with_quartiles, "areas": areas}
 
         elif entity_type == "area":
-            areas = list(set(row.get("area") for _, row in target_df.iterrows()))
-            target_area = pd.DataFrame([areas[0]], columns=["area"])
-            return target_area
+            areas = list(set(row.get("area") for row in rows))
+            return {"area": areas[0]}
 
-        elif entity_type == "category":
-            categories = list(set(row.get("category") for _, row in target_df.iterrows())) # sets to prevent duplicates
-            unique_quartiles = list(set(row.get("quartile") for _, row in target_df.iterrows() if row.get("quartile") is not None))
+        else:
+            categories = list(set(row.get("category") for row in rows)) # sets to prevent duplicates
+            unique_quartiles = list(set(row.get("quartile") for row in rows if row.get("quartile") is not None))
 
             if not unique_quartiles:
                 quartiles = None
@@ -368,74 +1740,120 @@ class CategoryQueryHandler(QueryHandler):
             else: 
                 quartiles = None
             
-            target_category = pd.DataFrame([[categories[0], quartiles]], columns=["category", "quartile"])
-            return target_category
-
-        else:
-            return pd.DataFrame()
+            return {"category": categories[0], "quartile": quartiles}
 
     def getCategoryObjectsById(self, id: str, entity_type: str) -> pd.DataFrame: 
-        path = self.getDbPathOrUrl()
         try:
-            with sqlite3.connect(path) as con:
+            with self.getConnection() as con:
+                if self.hasNormalisedSchema(con):
+                    return self.fetchFrame(con, self.getNormalisedObjectQuery(entity_type), (id,))
                 query = f"""
                     SELECT DISTINCT *
                     FROM Category
-                    WHERE LOWER("{entity_type}") = LOWER(?);
+                    WHERE "{entity_type}" = ? COLLATE NOCASE;
                 """ 
-                params = id.lower() 
-                cat_df = pd.read_sql(query, con, params=(params,)).drop_duplicates()
+                params = id
+                cat_df = self.fetchFrame(con, query, (params,)).drop_duplicates()
                 return cat_df 
         except Exception as e:
             self.unexpectedDatabaseError(e)
             return pd.DataFrame()
 
+    def getNormalisedObjectQuery(self, entity_type: str) -> str:
+        if entity_type == "category":
+            return """
+                SELECT c.category, jc.quartile
+                FROM Category c
+                LEFT JOIN JournalCategory jc ON jc.category_id = c.category_id
+                WHERE c.category = ? COLLATE NOCASE
+                GROUP BY c.category, jc.quartile;
+            """
+        if entity_type == "area":
+            return "SELECT area FROM Area WHERE area = ? COLLATE NOCASE;"
+        # journals are found through any of their identifiers
+        return """
+            SELECT j.journal_ids AS "journal-ids", c.category, jc.quartile, a.area
+            FROM JournalIdentifier ji
+            JOIN Journal j ON j.journal_id = ji.journal_id
+            JOIN JournalCategory jc ON jc.journal_id = j.journal_id
+            JOIN Category c ON c.category_id = jc.category_id
+            JOIN JournalArea ja ON ja.journal_id = j.journal_id
+            JOIN Area a ON a.area_id = ja.area_id
+            WHERE ji.identifier = ? COLLATE NOCASE;
+        """
+
     def getAllCategories(self) -> pd.DataFrame: # * Rumana
         try:
-            with sqlite3.connect(self.getDbPathOrUrl()) as con:
+            with self.getConnection() as con:
                 query = "SELECT DISTINCT category FROM Category;"
-                df = pd.read_sql(query, con)
+                df = self.fetchFrame(con, query)
                 return df
         except Exception as e:
             self.unexpectedDatabaseError(e)
             return pd.DataFrame()
             
     def getAllAreas(self) -> pd.DataFrame: # * Martina
-        path = self.getDbPathOrUrl()
         try:
-            with sqlite3.connect(path) as con:
+            with self.getConnection() as con:
                 query = "SELECT DISTINCT area FROM Category;" # DISTINCT allows to avoid showing duplicates.
-                areas_df = pd.read_sql(query, con)
+                if self.hasNormalisedSchema(con):
+                    query = "SELECT area FROM Area ORDER BY area_id;"
+                areas_df = self.fetchFrame(con, query)
                 return areas_df
         except Exception as e:
             self.unexpectedDatabaseError(e)
             return pd.DataFrame() # in order to always return a DataFrame object, even if the queries fails for some reason.   
 
+    def getAllCategoriesPage(self, after: Optional[str] = None, page_size: int = 1000) -> pd.DataFrame:
+        return self.getNamesPage("category", after, page_size)
+
+    def getAllAreasPage(self, after: Optional[str] = None, page_size: int = 1000) -> pd.DataFrame:
+        return self.getNamesPage("area", after, page_size)
+
+    def getNamesPage(self, column: str, after: Optional[str], page_size: int) -> pd.DataFrame:
+        # keyset pagination: the next page_size names after the last one of the previous page, in the order of the 
+        # case-insensitive indexes of both schemas (the exact name breaks the ties), so every page is an index range
+        try:
+            with self.getConnection() as con:
+                table = "Area" if column == "area" and self.hasNormalisedSchema(con) else "Category"
+                keyset = ""
+                params = [page_size]
+                if after is not None:
+                    keyset = f"WHERE {column} >= ? COLLATE NOCASE AND ({column} COLLATE NOCASE, {column}) > (?, ?)"
+                    params = [after, after, after, page_size]
+                query = f"SELECT DISTINCT {column} FROM {table} {keyset} ORDER BY {column} COLLATE NOCASE, {column} LIMIT ?;"
+                return self.fetchFrame(con, query, params)
+        except Exception as e:
+            self.unexpectedDatabaseError(e)
+            return pd.DataFrame()
+
     def getCategoriesWithQuartile(self, quartiles: Optional[set[str]]) -> pd.DataFrame: # * Nico
-        path = self.getDbPathOrUrl() # a safer way to access the path than directly accessing the variable
         categories_with_quartiles_df = pd.DataFrame([], columns=["category", "quartile"])
 
         try:
-            with sqlite3.connect(path) as con:
+            with self.getConnection() as con:
                 if not quartiles:
                     query = """
                     SELECT DISTINCT category
                     FROM Category;
                     """
-                    category_df = pd.read_sql(query, con).iloc[::-1]
+                    category_df = self.fetchFrame(con, query).iloc[::-1]
                     
                 else:
+                    source = "Category"
+                    if self.hasNormalisedSchema(con):
+                        source = "JournalCategory jc JOIN Category c ON c.category_id = jc.category_id"
                     query = f"""
                     SELECT DISTINCT category
-                    FROM Category 
+                    FROM {source} 
                     WHERE {" OR ".join(["quartile = ?" for _ in quartiles])}
                     """
-                    category_df = pd.read_sql(query, con,  params=[f"{quartile}" for quartile in quartiles]).iloc[::-1]
+                    category_df = self.fetchFrame(con, query, [f"{quartile}" for quartile in quartiles]).iloc[::-1]
             
-            for _, row in category_df.iterrows():
-                category_id = row.get("category")
-                new_category = self.getById(category_id)
-                categories_with_quartiles_df = pd.concat([new_category, categories_with_quartiles_df], ignore_index=True)
+            # one bulk lookup instead of a getById per category, keeping the order of the categories
+            found_df = self.getByIds(category_df["category"].iloc[::-1])
+            if not found_df.empty:
+                categories_with_quartiles_df = found_df[["category", "quartile"]].reset_index(drop=True)
 
             return categories_with_quartiles_df
         
@@ -445,56 +1863,231 @@ class CategoryQueryHandler(QueryHandler):
 
     def getCategoriesAssignedToAreas(self, area_ids: set[str]) -> pd.DataFrame: # * Ila
         # it returns a data frame containing all the categories assigned to particular areas specified as input, with no repetitions. In case the input collection of areas is empty, it is like all areas are actually specified.
-        path = self.getDbPathOrUrl()
         try:
-            with sqlite3.connect(path) as con:
+            with self.getConnection() as con:
                 if area_ids:
-                    area_ids_lower = [a.lower() for a in area_ids]
+                    area_ids = list(area_ids)
                     query = f"""
                         SELECT DISTINCT area, category
-                        FROM Category
-                        WHERE {" OR ".join(["LOWER(area) LIKE ?" for _ in area_ids_lower])}
+                        FROM {self.getCategoryAreaSource(con)}
+                        WHERE area COLLATE NOCASE IN ({", ".join(["?" for _ in area_ids])})
                     """
-                    df = pd.read_sql(query, con, params=[f"{a}" for a in area_ids_lower])
+                    df = self.fetchFrame(con, query, area_ids)
                 else:
-                    query = """
+                    query = f"""
                         SELECT DISTINCT area, category
-                        FROM Category
+                        FROM {self.getCategoryAreaSource(con)}
                     """
-                    df = pd.read_sql(query, con)
+                    df = self.fetchFrame(con, query)
                 return df
         except Exception as e:
             self.unexpectedDatabaseError(e)
             return pd.DataFrame()
     
     def getAreasAssignedToCategories(self, category_ids: set[str]) -> pd.DataFrame: # * Nico
-        path = self.getDbPathOrUrl()
-        query = """
-            SELECT DISTINCT area, category
-            FROM Category
-        """
         try:
-            with sqlite3.connect(path) as con:
+            with self.getConnection() as con:
+                query = f"""
+                    SELECT DISTINCT area, category
+                    FROM {self.getCategoryAreaSource(con)}
+                """
                 if category_ids:
-                    category_ids = [f"{category_id.lower()}" for category_id in category_ids]
-                    query += f"""WHERE {" OR ".join(["LOWER(category) LIKE ?" for _ in category_ids])}"""
-                    areas_df = pd.read_sql(query, con, params=category_ids)
+                    category_ids = list(category_ids)
+                    query += f"""WHERE category COLLATE NOCASE IN ({", ".join(["?" for _ in category_ids])})"""
+                    areas_df = self.fetchFrame(con, query, category_ids)
                 else:
-                    areas_df = pd.read_sql(query, con)
+                    areas_df = self.fetchFrame(con, query)
                 areas_df = areas_df.drop_duplicates() 
                 return areas_df
         except Exception as e:
             self.unexpectedDatabaseError(e)
             return pd.DataFrame()
 
+    def getCategoryQuartiles(self) -> pd.DataFrame:
+        # every (category, quartile) pair of the database, with None for the journals without a quartile
+        try:
+            with self.getConnection() as con:
+                source = "Category"
+                if self.hasNormalisedSchema(con):
+                    source = "JournalCategory jc JOIN Category c ON c.category_id = jc.category_id"
+                return self.fetchFrame(con, f"SELECT DISTINCT category, quartile FROM {source};")
+        except Exception as e:
+            self.unexpectedDatabaseError(e)
+            return pd.DataFrame(columns=["category", "quartile"])
+
+    def getStatistics(self) -> pd.DataFrame:
+        # the counts written by CategoryUploadHandler, none for databases uploaded before they existed
+        try:
+            with self.getConnection() as con:
+                query = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Statistics';"
+                if con.execute(query).fetchone() is None:
+                    return pd.DataFrame(columns=["kind", "value", "count"])
+                return self.fetchFrame(con, "SELECT kind, value, count FROM Statistics;")
+        except Exception as e:
+            self.unexpectedDatabaseError(e)
+            return pd.DataFrame(columns=["kind", "value", "count"])
+
+    def getJournalIdentifiers(self, category_ids: Optional[Iterable[str]] = None, quartiles: Optional[Iterable[str]] = None, 
+                              area_ids: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        # the identifiers of the journals (one row each, with the journal they belong to) with one of the categories 
+        # in one of the quartiles (or with no quartile) and with one of the areas, as a single query; None (or empty) means no restriction
+        try:
+            with self.getConnection() as con:
+                query, params = self.getJournalIdentifiersQuery(con, list(category_ids or []), list(quartiles or []), list(area_ids or []))
+                return self.fetchFrame(con, query, params)
+        except Exception as e:
+            self.unexpectedDatabaseError(e)
+            return pd.DataFrame(columns=["identifier", "journal"])
+
+    def getJournalIdentifiersQuery(self, con: sqlite3.Connection, category_ids: list[str], quartiles: list[str], 
+                                   area_ids: list[str]) -> tuple[str, list[str]]:
+        if self.hasNormalisedSchema(con):
+            query = """SELECT DISTINCT ji.identifier AS identifier, ji.journal_id AS journal FROM JournalIdentifier ji 
+                       WHERE ji.journal_id IN (SELECT journal_id FROM JournalCategory)"""
+            journal_column = "ji.journal_id"
+            category_source = "SELECT jc.journal_id FROM JournalCategory jc JOIN Category c ON c.category_id = jc.category_id WHERE 1 = 1"
+            area_source = "SELECT ja.journal_id FROM JournalArea ja JOIN Area a ON a.area_id = ja.area_id WHERE 1 = 1"
+            quartile_column = "jc.quartile"
+        else:
+            query = 'SELECT DISTINCT "journal-ids" AS identifier, "internal-id" AS journal FROM Category WHERE 1 = 1'
+            journal_column = '"journal-ids"'
+            category_source = 'SELECT "journal-ids" FROM Category WHERE 1 = 1'
+            area_source = 'SELECT "journal-ids" FROM Category WHERE 1 = 1'
+            quartile_column = "quartile"
+
+        params = []
+        if category_ids or quartiles: # the category and its quartile have to be on the same row
+            if category_ids:
+                category_source += f""" AND category COLLATE NOCASE IN ({", ".join("?" for _ in category_ids)})"""
+                params.extend(category_ids)
+            if quartiles:
+                category_source += f""" AND ({quartile_column} IS NULL OR {quartile_column} IN ({", ".join("?" for _ in quartiles)}))"""
+                params.extend(quartiles)
+            query += f" AND {journal_column} IN ({category_source})"
+        if area_ids:
+            area_source += f""" AND area COLLATE NOCASE IN ({", ".join("?" for _ in area_ids)})"""
+            params.extend(area_ids)
+            query += f" AND {journal_column} IN ({area_source})"
+        return query, params
+
 class JournalQueryHandler(QueryHandler):
     def __init__(self):
         super().__init__()
+        self.session = SPARQLSession()
+        self.resultFormat = "csv" # "csv" (plain values) or "tsv" (RDF terms, decoded here)
+        self.valuesBatchSize = 500 # ids sent in a single VALUES block by getByIds
+        self.issnIndex = None # ((path, data version), whether every journal has its schema:issn keys)
+        self.textIndexPath = None # full-text index written by JournalUploadHandler, searched instead of the store when set
     
     @property
     def queryType(self) -> str:
         return "Blazegraph"
 
+    def setDbPathOrUrl(self, pathOrUrl: str) -> bool:
+        # besides Blazegraph, the journals can be read from an embedded rdflib graph (memory:// or an N-Triples file)
+        if isEmbeddedStore(pathOrUrl):
+            self.dbPathOrUrl = pathOrUrl
+            return True
+        return super().setDbPathOrUrl(pathOrUrl)
+
+    def getResultFormat(self) -> str:
+        return self.resultFormat
+
+    def setResultFormat(self, resultFormat: str) -> bool:
+        if resultFormat not in ("csv", "tsv"):
+            return False
+        self.resultFormat = resultFormat
+        return True
+
+    def getTextIndexPath(self) -> Optional[str]:
+        return self.textIndexPath
+
+    def setTextIndexPath(self, textIndexPath: Optional[str]) -> bool:
+        if textIndexPath is not None and (not textIndexPath.strip() or not textIndexPath.endswith(".db")):
+            return False
+        self.textIndexPath = textIndexPath
+        return True
+
+    def close(self):
+        self.session.close()
+
+    def runQuery(self, query: str) -> pd.DataFrame:
+        # POSTs the SELECT query on the handler's keep-alive session and decodes the results into typed columns
+        if isEmbeddedStore(self.getDbPathOrUrl()):
+            return getEmbeddedStore(self.getDbPathOrUrl()).select(query)
+        data = self.session.post(self.getDbPathOrUrl(), query.encode("utf-8"), self.getQueryHeaders())
+        return self.decodeResults(data)
+
+    def getQueryHeaders(self) -> dict[str, str]:
+        accept = "text/csv" if self.resultFormat == "csv" else "text/tab-separated-values"
+        return {"Content-Type": "application/sparql-query; charset=utf-8", "Accept": accept}
+
+    def decodeResults(self, data: bytes) -> pd.DataFrame:
+        if self.resultFormat == "csv":
+            return self.decodeCsvResults(data)
+        return self.decodeTsvResults(data)
+
+    def decodeCsvResults(self, data: bytes) -> pd.DataFrame:
+        if not data.strip():
+            return pd.DataFrame()
+        results_df = pd.read_csv(io.BytesIO(data), sep=",", encoding="utf-8")
+        for column in ("seal", "apc"): # booleans stay booleans even when the column is empty
+            if column in results_df.columns and results_df[column].dtype != bool:
+                results_df[column] = results_df[column].astype(str).str.lower().eq("true")
+        return results_df
+
+    def decodeTsvResults(self, data: bytes) -> pd.DataFrame:
+        if not data.strip():
+            return pd.DataFrame()
+        results_df = pd.read_csv(io.BytesIO(data), sep="\t", encoding="utf-8", quoting=csv.QUOTE_NONE, 
+                                 dtype=str, keep_default_na=False)
+        results_df.columns = [column.lstrip("?") for column in results_df.columns]
+        for column in results_df.columns:
+            terms = results_df[column]
+            literals = terms.str.extract(r'^"(?P<value>.*)"(?:@[\w-]+|\^\^<(?P<datatype>[^>]*)>)?$')
+            values = (literals["value"]
+                      .str.replace(r'\\(["\\tnr])', lambda m: {"t": "\t", "n": "\n", "r": "\r"}.get(m.group(1), m.group(1)), regex=True))
+            values = values.where(literals["value"].notna(), terms.str.strip("<>")) # IRIs
+            values = values.where(terms != "", None) # unbound variables
+            datatypes = literals["datatype"].dropna().unique()
+            if len(datatypes) == 1 and datatypes[0] == "http://www.w3.org/2001/XMLSchema#boolean" and values.notna().all():
+                values = values.eq("true") 
+            elif len(datatypes) == 1 and datatypes[0] == "http://www.w3.org/2001/XMLSchema#integer" and values.notna().all():
+                values = values.astype("int64")
+            results_df[column] = values
+        return results_df
+
+    def hasIssnIndex(self) -> bool:
+        # stores loaded before the schema:issn keys existed are still searched with CONTAINS over the identifiers;
+        # checked again after each upload made through this process
+        key = (self.getDbPathOrUrl(), getDataVersion(self.getDbPathOrUrl()))
+        if self.issnIndex is None or self.issnIndex[0] != key:
+            try:
+                self.issnIndex = (key, self.runQuery(self.getIssnIndexQuery()).empty)
+            except Exception: # not cached: the lookup query reports the error
+                return False
+        return self.issnIndex[1]
+
+    def getIssnIndexQuery(self) -> str:
+        # a journal with identifiers but no keys
+        return """
+        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+        PREFIX schema: <https://schema.org/>
+
+        SELECT ?s
+        WHERE {
+            ?s rdf:type schema:Periodical .
+            ?s schema:identifier ?id .
+            FILTER (STR(?id) != "")
+            FILTER NOT EXISTS { ?s schema:issn ?issn }
+        }
+        LIMIT 1
+        """
+
+    def getIssnKeys(self, id: str) -> list[str]:
+        # the schema:issn values an id stands for: "issn, eissn" needs both
+        return list(dict.fromkeys(key.strip().upper() for key in id.split(",") if key.strip()))
+
     def getById(self, id: str) -> pd.DataFrame: 
         possible_journal_ids = id.split(", ")
         possible_journal_ids.insert(0, id) # adding this possibility too (i.e. all ids are together)
@@ -511,14 +2104,71 @@ class JournalQueryHandler(QueryHandler):
         journal_df = pd.DataFrame([journal_row_values], columns=["journal-ids", "title", "languages", "publisher", "seal", "license", "apc"])
         return journal_df
 
-    def getJournalById(self, id: str) -> pd.DataFrame: 
-        endpoint = self.getDbPathOrUrl()
-        query = f"""
+    def getByIds(self, ids: Iterable[str]) -> pd.DataFrame:
+        # bulk version of getById: every candidate id goes in a VALUES block (a few hundred per request) 
+        # and the result has one row per id that was found, indexed by the input id
+        ids = list(dict.fromkeys(ids))
+        try:
+            exact = self.hasIssnIndex()
+            journals_dfs = [self.runQuery(query) for query in self.getJournalMatchQueries(ids, exact)]
+        except Exception as e:
+            self.unexpectedDatabaseError(e)
+            return pd.DataFrame(columns=["journal-ids", "title", "languages", "publisher", "seal", "license", "apc"])
+        return self.combineJournalMatches(ids, journals_dfs, exact)
+
+    def getJournalMatchQueries(self, ids: list[str], exact: bool = False) -> list[str]:
+        if exact: # the keys of all the candidates, each matched on its own
+            possible_journal_ids = list(dict.fromkeys(key for id in ids for key in self.getIssnKeys(id)))
+        else:
+            possible_journal_ids = list(dict.fromkeys(journal_id for id in ids for journal_id in [id] + id.split(", ")))
+        return [self.getJournalMatchQuery(possible_journal_ids[start:start + self.valuesBatchSize], exact) 
+                for start in range(0, len(possible_journal_ids), self.valuesBatchSize)]
+
+    def combineJournalMatches(self, ids: list[str], journals_dfs: list[pd.DataFrame], exact: bool = False) -> pd.DataFrame:
+        columns = ["journal-ids", "title", "languages", "publisher", "seal", "license", "apc"]
+        matches = {}
+        for journals_df in journals_dfs:
+            for row in journals_df.rename(columns={"id": "journal-ids"}).to_dict("records"):
+                matches.setdefault(row.pop("key"), row) # the first row per candidate, as in getById
+
+        found_ids = []
+        records = []
+        for id in ids:
+            for journal_id in [id] + id.split(", "): # keeping the priority of the candidates
+                match = self.getJournalMatch(journal_id, matches, exact)
+                if match is not None:
+                    found_ids.append(id)
+                    records.append({column: match[column] for column in columns})
+                    break
+        journals_df = pd.DataFrame.from_records(records, columns=columns, index=pd.Index(found_ids, name="id", dtype=object))
+        return self.uniqueLanguages(journals_df)
+
+    def getJournalMatch(self, journal_id: str, matches: dict[str, dict], exact: bool) -> Optional[dict]:
+        if not exact:
+            return matches.get(journal_id)
+        rows = [matches.get(key) for key in self.getIssnKeys(journal_id)]
+        if not rows or None in rows or len({row["s"] for row in rows}) > 1: # all the keys, on the same journal
+            return None
+        return rows[0]
+
+    def uniqueLanguages(self, journals_df: pd.DataFrame) -> pd.DataFrame:
+        if not journals_df.empty and "languages" in journals_df.columns: # dropping duplicates
+            journals_df["languages"] = journals_df["languages"].apply(
+                lambda langs: ", ".join(dict.fromkeys(langs.split(", "))) if isinstance(langs, str) else langs
+            )
+        return journals_df
+
+    def getJournalMatchQuery(self, ids: list[str], exact: bool = False) -> str:
+        keys = " ".join(json.dumps(id) for id in ids) # JSON strings are valid SPARQL string literals
+        if exact:
+            return f"""
         PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
         PREFIX schema: <https://schema.org/>
 
-        SELECT ?id ?title ?publisher ?seal ?license ?apc (GROUP_CONCAT(DISTINCT STR(?language); separator=", ") AS ?languages)
+        SELECT ?key ?s ?id ?title ?publisher ?seal ?license ?apc (GROUP_CONCAT(DISTINCT STR(?language); separator=", ") AS ?languages)
         WHERE {{ 
+            VALUES ?key {{ {keys} }}
+            ?s schema:issn ?key .
             ?s rdf:type schema:Periodical .
             ?s schema:identifier ?id .
             ?s schema:name ?title .
@@ -527,201 +2177,677 @@ class JournalQueryHandler(QueryHandler):
             ?s schema:license ?license .
             ?s schema:hasAPC ?apc .
             ?s schema:inLanguage ?language .
-
-            FILTER CONTAINS(LCASE(STR(?id)), LCASE("{id}"))
         }}
-        GROUP BY ?id ?title ?publisher ?seal ?license ?apc
+        GROUP BY ?key ?s ?id ?title ?publisher ?seal ?license ?apc
         """
-        try:
-            titles_df = sparql_dataframe.get(endpoint, query, True).rename(columns={"id": "journal-ids"})
-            
-            if not titles_df.empty and "languages" in titles_df.columns: # dropping duplicates
-                titles_df["languages"] = titles_df["languages"].apply(
-                    lambda langs: ", ".join(dict.fromkeys(langs.split(", "))) if isinstance(langs, str) else langs
-                )
-            
-            return titles_df
-        except Exception as e:
-            self.unexpectedDatabaseError(e)
-            return pd.DataFrame()
-
-    def getAllJournals(self): # * Martina
-        endpoint = self.getDbPathOrUrl()
-        journal_query = f"""
+        return f"""
         PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
         PREFIX schema: <https://schema.org/>
 
-        SELECT ?id ?title ?languages ?publisher ?seal ?license ?apc
+        SELECT ?key ?id ?title ?publisher ?seal ?license ?apc (GROUP_CONCAT(DISTINCT STR(?language); separator=", ") AS ?languages)
         WHERE {{ 
+            {{ # the keys are matched against the identifiers alone, then the rest is joined on the matching journals
+                SELECT ?key ?s ?id 
+                WHERE {{
+                    ?s schema:identifier ?id .
+                    VALUES ?key {{ {keys} }}
+                    FILTER CONTAINS(LCASE(STR(?id)), LCASE(?key))
+                }}
+            }}
             ?s rdf:type schema:Periodical .
-            ?s schema:identifier ?id . 
-            ?s schema:name ?title . 
-            ?s schema:inLanguage ?languages .
+            ?s schema:name ?title .
             ?s schema:publisher ?publisher .
             ?s schema:hasDOAJSeal ?seal .
             ?s schema:license ?license .
             ?s schema:hasAPC ?apc .
-        }} 
+            ?s schema:inLanguage ?language .
+        }}
+        GROUP BY ?key ?id ?title ?publisher ?seal ?license ?apc
         """
-        try:    
-            journal_df = sparql_dataframe.get(endpoint, journal_query, True).rename(columns={"id": "journal-ids"})
-            return journal_df
-        
-        except Exception as e:
-            self.unexpectedDatabaseError(e)
-            return pd.DataFrame()
-        
-    def getJournalsWithTitle(self, partialTitle: str): # * Nico
-        endpoint = self.getDbPathOrUrl()
+
+    def getJournalById(self, id: str) -> pd.DataFrame: 
+        return self.selectJournals(self.getJournalByIdQuery, id, self.hasIssnIndex())
+
+    def getJournalByIdQuery(self, id: str, exact: bool = False) -> str:
+        if exact: # no key matches nothing
+            id_pattern = " ".join(f"?s schema:issn {json.dumps(key)} ." for key in self.getIssnKeys(id) or [""])
+        else:
+            id_pattern = f'FILTER CONTAINS(LCASE(STR(?id)), LCASE("{id}"))'
         query = f"""
         PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
         PREFIX schema: <https://schema.org/>
 
-        SELECT ?id ?title ?languages ?publisher ?seal ?license ?apc
+        SELECT ?id ?title ?publisher ?seal ?license ?apc (GROUP_CONCAT(DISTINCT STR(?language); separator=", ") AS ?languages)
         WHERE {{ 
+            {id_pattern}
             ?s rdf:type schema:Periodical .
-            ?s schema:identifier ?id . 
-            ?s schema:name ?title . 
-            ?s schema:inLanguage ?languages .
+            ?s schema:identifier ?id .
+            ?s schema:name ?title .
             ?s schema:publisher ?publisher .
             ?s schema:hasDOAJSeal ?seal .
             ?s schema:license ?license .
             ?s schema:hasAPC ?apc .
-
-            FILTER CONTAINS(LCASE(STR(?title)), LCASE("{partialTitle}"))
-        }} 
+            ?s schema:inLanguage ?language .
+        }}
+        GROUP BY ?id ?title ?publisher ?seal ?license ?apc
         """
+        return query
+
+    def getAllJournals(self, projection: str = "full"): # * Martina
+        return self.selectJournals(self.getAllJournalsQuery, projection)
 
+    def getAllJournalsQuery(self, projection: str = "full") -> str:
+        return self.getJournalsQuery(projection=projection)
+
+    def selectJournals(self, create_query, *args) -> pd.DataFrame:
+        # the journals of the query made by create_query(*args), with its id column renamed
         try:
-            titles_df = sparql_dataframe.get(endpoint, query, True).rename(columns={"id": "journal-ids"})
-            return titles_df
+            journals_df = self.dropEmptyGroup(self.runQuery(create_query(*args))).rename(columns={"id": "journal-ids"})
+            return self.uniqueLanguages(journals_df)
         except Exception as e:
             self.unexpectedDatabaseError(e)
             return pd.DataFrame()
 
-    def getJournalsPublishedBy(self, partialName: str): # * Ila
-        # it returns a data frame containing all the journals that have, as a publisher, any that matches (even partially) with the input string.
-        endpoint = self.getDbPathOrUrl()
-        safe_partialName = json.dumps(partialName)[1:-1] # for controlling special characters- the json method adds the quotes and [1: -1] removes them
-        
-        query = f"""
+    def dropEmptyGroup(self, journals_df: pd.DataFrame) -> pd.DataFrame:
+        # rdflib answers a grouped query without matches with a row of unbound values
+        if "id" in journals_df.columns:
+            return journals_df.dropna(subset=["id"])
+        return journals_df
+
+    def getJournalsQuery(self, condition: str = "", projection: str = "full", subject: bool = False, order: str = "") -> str:
+        # the list queries: the journals matching the condition (patterns first, then FILTERs), one row per journal with 
+        # its languages concatenated by the store ("full"), or only their identifiers ("ids"); subject adds ?s
+        if projection not in ("full", "ids"):
+            raise ValueError(f"unknown projection '{projection}', expected 'full' or 'ids'")
+        s = "?s " if subject else ""
+        if projection == "ids":
+            select = f"SELECT DISTINCT {s}?id"
+            group_by = ""
+        else:
+            select = f'SELECT {s}?id ?title (GROUP_CONCAT(DISTINCT STR(?language); separator=", ") AS ?languages) ?publisher ?seal ?license ?apc'
+            group_by = f"GROUP BY {s}?id ?title ?publisher ?seal ?license ?apc"
+        return f"""
         PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
         PREFIX schema: <https://schema.org/>
 
-        SELECT ?id ?title ?languages ?publisher ?seal ?license ?apc
+        {select}
         WHERE {{ 
+            {condition}
             ?s rdf:type schema:Periodical .
             ?s schema:identifier ?id . 
             ?s schema:name ?title . 
-            ?s schema:inLanguage ?languages .
             ?s schema:publisher ?publisher .
             ?s schema:hasDOAJSeal ?seal .
             ?s schema:license ?license .
             ?s schema:hasAPC ?apc .
-
-            FILTER CONTAINS(LCASE(STR(?publisher)), LCASE("{safe_partialName}"))
-        }} 
+            ?s schema:inLanguage ?language .
+        }}
+        {group_by}
+        {order}
         """
+
+    def getJournalsWithTitle(self, partialTitle: str, limit: Optional[int] = None, projection: str = "full"): # * Nico
         try:
-            journals_df = sparql_dataframe.get(endpoint, query, True).rename(columns={"id": "journal-ids"})
+            subjects = self.searchJournalText("title", partialTitle, limit)
+        except Exception as e:
+            self.unexpectedDatabaseError(e)
+            return pd.DataFrame()
+        if subjects is not None:
+            return self.getJournalsBySubjects(subjects, projection)
+        return self.limitJournals(self.selectJournals(self.getJournalsWithTitleQuery, partialTitle, projection), limit)
+
+    def searchJournalText(self, column: str, text: str, limit: Optional[int] = None) -> Optional[list[str]]:
+        # the subjects whose title (or publisher) contains the text, best match first; None when the index cannot 
+        # answer: no index for this endpoint, or fewer than 3 characters (no trigram to look up)
+        if self.textIndexPath is None or len(text) < 3 or not os.path.exists(self.textIndexPath):
+            return None
+        con = sqlite3.connect(self.textIndexPath)
+        try:
+            if con.execute("SELECT 1 FROM sqlite_master WHERE name = 'JournalText';").fetchone() is None:
+                return None
+            if con.execute("SELECT 1 FROM JournalText WHERE endpoint = ? LIMIT 1;", (self.getDbPathOrUrl(),)).fetchone() is None:
+                return None
+            rows = con.execute(f"""
+                SELECT JournalText.subject
+                FROM JournalTextIndex CROSS JOIN JournalText ON JournalText.id = JournalTextIndex.rowid -- the index first
+                WHERE JournalTextIndex.{column} MATCH ? AND JournalText.endpoint = ?
+                ORDER BY JournalTextIndex.rank, JournalText.subject;
+            """, ('"' + text.replace('"', '""') + '"', self.getDbPathOrUrl()))
+            subjects = {} # a journal uploaded twice with different titles has two rows: the best one counts
+            for subject, in rows:
+                subjects[subject] = None
+                if len(subjects) == limit:
+                    break
+            return list(subjects)
+        finally:
+            con.close()
+
+    def getJournalsBySubjects(self, subjects: list[str], projection: str = "full") -> pd.DataFrame:
+        try:
+            journals_dfs = [self.runQuery(query) for query in self.getJournalsBySubjectsQueries(subjects, projection)]
+        except Exception as e:
+            self.unexpectedDatabaseError(e)
+            return pd.DataFrame()
+        return self.orderJournalsBySubjects(subjects, journals_dfs)
+
+    def getJournalsBySubjectsQueries(self, subjects: list[str], projection: str = "full") -> list[str]:
+        return [self.getJournalsBySubjectsQuery(subjects[start:start + self.valuesBatchSize], projection) 
+                for start in range(0, len(subjects), self.valuesBatchSize)]
+
+    def getJournalsBySubjectsQuery(self, subjects: list[str], projection: str = "full") -> str:
+        values = " ".join(f"<{subject}>" for subject in subjects)
+        return self.getJournalsQuery(f"VALUES ?s {{ {values} }}", projection, subject=True)
+
+    def orderJournalsBySubjects(self, subjects: list[str], journals_dfs: list[pd.DataFrame]) -> pd.DataFrame:
+        # the rows in the ranking of the text index
+        journals_dfs = [self.dropEmptyGroup(journals_df) for journals_df in journals_dfs]
+        journals_dfs = [journals_df for journals_df in journals_dfs if not journals_df.empty]
+        if not journals_dfs:
+            return pd.DataFrame()
+        journals_df = pd.concat(journals_dfs, ignore_index=True)
+        ranks = {subject: rank for rank, subject in enumerate(subjects)}
+        journals_df = journals_df.iloc[journals_df["s"].map(ranks).argsort(kind="stable")]
+        journals_df = journals_df.drop(columns="s").rename(columns={"id": "journal-ids"}).reset_index(drop=True)
+        return self.uniqueLanguages(journals_df)
+
+    def limitJournals(self, journals_df: pd.DataFrame, limit: Optional[int]) -> pd.DataFrame:
+        # the rows of the first journals
+        if limit is None or journals_df.empty:
             return journals_df
+        first_ids = journals_df["journal-ids"].drop_duplicates().iloc[:limit]
+        return journals_df[journals_df["journal-ids"].isin(first_ids)]
+
+    def getJournalsWithTitleQuery(self, partialTitle: str, projection: str = "full") -> str:
+        return self.getJournalsQuery(f'FILTER CONTAINS(LCASE(STR(?title)), LCASE("{partialTitle}"))', projection)
+
+    def getJournalsPublishedBy(self, partialName: str, limit: Optional[int] = None, projection: str = "full"): # * Ila
+        # it returns a data frame containing all the journals that have, as a publisher, any that matches (even partially) with the input string.
+        try:
+            subjects = self.searchJournalText("publisher", partialName, limit)
         except Exception as e:
             self.unexpectedDatabaseError(e)
             return pd.DataFrame()
+        if subjects is not None:
+            return self.getJournalsBySubjects(subjects, projection)
+        return self.limitJournals(self.selectJournals(self.getJournalsPublishedByQuery, partialName, projection), limit)
 
-    def getJournalsWithLicense(self, licenses: set[str]) -> pd.DataFrame: # * Rumana
-        endpoint = self.getDbPathOrUrl()
+    def getJournalsPublishedByQuery(self, partialName: str, projection: str = "full") -> str:
+        safe_partialName = json.dumps(partialName)[1:-1] # for controlling special characters- the json method adds the quotes and [1: -1] removes them
+        return self.getJournalsQuery(f'FILTER CONTAINS(LCASE(STR(?publisher)), LCASE("{safe_partialName}"))', projection)
+
+    def getJournalsWithLicense(self, licenses: set[str], projection: str = "full") -> pd.DataFrame: # * Rumana
+        return self.selectJournals(self.getJournalsWithLicenseQuery, licenses, projection)
+
+    def getJournalsWithLicenseQuery(self, licenses: set[str], projection: str = "full") -> str:
+        filter_clause = self.getLicenseFilter(licenses)
+        return self.getJournalsQuery(f"FILTER ({filter_clause})", projection)
+
+    def getLicenseFilter(self, licenses: Iterable[str]) -> str:
         l_set = {l.strip().lower() for l in licenses}
         filters = []   
 
         for license_val in l_set:
             license_val_escaped = license_val.replace('"', '\\"')   
             filters.append(f'CONTAINS(LCASE(STR(?license)), "{license_val_escaped}")')  
-        filter_clause = " || ".join(filters)
+        return " || ".join(filters)
 
-        query = f"""
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX schema: <https://schema.org/>
-        SELECT ?id ?title ?languages ?publisher ?seal ?license ?apc
-        WHERE {{
-            ?s rdf:type schema:Periodical ;
-            schema:identifier ?id ;
-            schema:name ?title ;
-            schema:inLanguage ?languages ;
-            schema:publisher ?publisher ;
-            schema:hasDOAJSeal ?seal ;
-            schema:license ?license ;
-            schema:hasAPC ?apc .
-            FILTER ({filter_clause})
-        }}
-        """
+    def getJournalsWithAPC(self, projection: str = "full"): # * Martina
+        return self.selectJournals(self.getJournalsWithAPCQuery, projection)
+
+    def getJournalsWithAPCQuery(self, projection: str = "full") -> str:
+        return self.getJournalsQuery("FILTER (?apc = true)", projection)
+
+    def getJournalsWithDOAJSeal(self, projection: str = "full"): # * Nico
+        return self.selectJournals(self.getJournalsWithDOAJSealQuery, projection)
+
+    def getJournalsWithDOAJSealQuery(self, projection: str = "full") -> str:
+        return self.getJournalsQuery("FILTER (?seal = true)", projection)
+
+    def getStatistics(self) -> pd.DataFrame:
+        # the counts recorded by JournalUploadHandler in this process, or else counted once by the triplestore
+        statistics_df = getDataStatistics(self.getDbPathOrUrl())
+        if statistics_df is not None:
+            return statistics_df
         try:
-            jou_df = sparql_dataframe.get(endpoint, query, True)
-            return jou_df.rename(columns={"id": "journal-ids"})
+            counts_df = self.runQuery(self.getStatisticsQuery())
         except Exception as e:
             self.unexpectedDatabaseError(e)
-            return pd.DataFrame()
-
-    def getJournalsWithAPC(self): # * Martina
-        endpoint = self.getDbPathOrUrl()
-        jouAPC_query = """
-        PREFIX rdf:    <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+            return pd.DataFrame(columns=["kind", "value", "count"])
+        if counts_df.empty:
+            return pd.DataFrame(columns=["kind", "value", "count"])
+        statistics_df = countJournalStatistics(counts_df)
+        setDataStatistics(self.getDbPathOrUrl(), statistics_df)
+        return statistics_df
+
+    def getStatisticsQuery(self) -> str:
+        return """
+        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
         PREFIX schema: <https://schema.org/>
 
-        SELECT ?id ?title ?languages ?publisher ?seal ?license ?apc
-        WHERE {{
+        SELECT ?license ?apc ?seal (COUNT(DISTINCT ?s) AS ?count)
+        WHERE {
             ?s rdf:type schema:Periodical .
-            ?s schema:identifier ?id . 
-            ?s schema:name ?title . 
-            ?s schema:inLanguage ?languages .
-            ?s schema:publisher ?publisher .
-            ?s schema:hasDOAJSeal ?seal .
             ?s schema:license ?license .
             ?s schema:hasAPC ?apc .
-            
-            FILTER (?apc = true)
-        }}
+            ?s schema:hasDOAJSeal ?seal .
+        }
+        GROUP BY ?license ?apc ?seal
         """
+
+    def getFilteredJournals(self, identifiers: Optional[Iterable[str]] = None, licenses: Optional[Iterable[str]] = None, 
+                            apc: Optional[bool] = None, projection: str = "full") -> pd.DataFrame:
+        # the journals containing one of the identifiers, with one of the licenses and with or without APC, 
+        # filtered by the triplestore; None (or no licenses) means no restriction
         try:
-            jouAPC_df = sparql_dataframe.get(endpoint, jouAPC_query, True).rename(columns={"id": "journal-ids"})
-            return jouAPC_df
-        
+            exact = identifiers is not None and self.hasIssnIndex()
+            journals_dfs = [self.runQuery(query) for query in self.getFilteredJournalsQueries(identifiers, licenses, apc, exact, projection)]
         except Exception as e:
             self.unexpectedDatabaseError(e)
             return pd.DataFrame()
-    
-    def getJournalsWithDOAJSeal(self): # * Nico
-        endpoint = self.getDbPathOrUrl()
-        query = """
-        PREFIX rdf:    <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX schema: <https://schema.org/>
+        return self.combineFilteredJournals(journals_dfs)
+
+    def getFilteredJournalsQueries(self, identifiers: Optional[Iterable[str]], licenses: Optional[Iterable[str]], 
+                                   apc: Optional[bool], exact: bool = False, projection: str = "full") -> list[str]:
+        if identifiers is None:
+            return [self.getFilteredJournalsQuery(None, licenses, apc, projection=projection)]
+        if exact: # a journal with any of the keys: a superset, as the engines check the identifiers again
+            identifiers = list(dict.fromkeys(key for identifier in identifiers for key in self.getIssnKeys(identifier)))
+        else:
+            identifiers = list(dict.fromkeys(identifier.upper() for identifier in identifiers))
+        return [self.getFilteredJournalsQuery(identifiers[start:start + self.valuesBatchSize], licenses, apc, exact, projection) 
+                for start in range(0, len(identifiers), self.valuesBatchSize)]
+
+    def combineFilteredJournals(self, journals_dfs: list[pd.DataFrame]) -> pd.DataFrame:
+        journals_dfs = [self.dropEmptyGroup(journals_df) for journals_df in journals_dfs]
+        journals_dfs = [journals_df for journals_df in journals_dfs if not journals_df.empty]
+        if not journals_dfs:
+            return pd.DataFrame()
+        journals_df = pd.concat(journals_dfs, ignore_index=True).drop_duplicates(subset="id", ignore_index=True) # a journal found by two batches
+        return self.uniqueLanguages(journals_df.rename(columns={"id": "journal-ids"}))
+
+    def getJournalFilters(self, licenses: Optional[Iterable[str]], apc: Optional[bool]) -> str:
+        filters = []
+        if licenses:
+            filters.append(f"FILTER ({self.getLicenseFilter(licenses)})")
+        if apc is not None:
+            filters.append(f"FILTER (?apc = {'true' if apc else 'false'})")
+        return " ".join(filters)
+
+    def getFilteredJournalsPage(self, licenses: Optional[Iterable[str]] = None, apc: Optional[bool] = None, 
+                                after: Optional[str] = None, page_size: int = 1000) -> pd.DataFrame:
+        # keyset pagination over getFilteredJournals without identifiers: the next page_size journals in subject order,
+        # after the subject ("s" column) of the last journal of the previous page
+        return self.selectJournals(self.getFilteredJournalsPageQuery, licenses, apc, after, page_size)
+
+    def getFilteredJournalsPageQuery(self, licenses: Optional[Iterable[str]], apc: Optional[bool], after: Optional[str], 
+                                     page_size: int) -> str:
+        filters = self.getJournalFilters(licenses, apc)
+        keyset = "" if after is None else f"FILTER (STR(?s) > {json.dumps(after)})"
+        page = f"""{{ # the subjects of the page first, so that LIMIT counts journals and not rows
+                SELECT DISTINCT ?s
+                WHERE {{
+                    ?s rdf:type schema:Periodical .
+                    ?s schema:license ?license .
+                    ?s schema:hasAPC ?apc .
+                    {filters} {keyset}
+                }}
+                ORDER BY STR(?s)
+                LIMIT {int(page_size)}
+            }}
+            {filters}"""
+        return self.getJournalsQuery(page, subject=True, order="ORDER BY STR(?s)")
+
+    def getFilteredJournalsQuery(self, identifiers: Optional[list[str]], licenses: Optional[Iterable[str]], apc: Optional[bool], 
+                                 exact: bool = False, projection: str = "full") -> str:
+        identifier_pattern = ""
+        if identifiers is not None and exact:
+            keys = " ".join(json.dumps(identifier) for identifier in identifiers)
+            identifier_pattern = f"""{{ # exact matches on the keys
+                SELECT DISTINCT ?s
+                WHERE {{
+                    VALUES ?key {{ {keys} }}
+                    ?s schema:issn ?key .
+                }}
+            }}"""
+        elif identifiers is not None:
+            keys = " ".join(json.dumps(identifier) for identifier in identifiers)
+            identifier_pattern = f"""{{ # as in getJournalMatchQuery, the keys are matched against the identifiers alone
+                SELECT DISTINCT ?s
+                WHERE {{
+                    ?s schema:identifier ?key_id .
+                    VALUES ?key {{ {keys} }}
+                    FILTER CONTAINS(UCASE(STR(?key_id)), ?key)
+                }}
+            }}"""
+        filters = self.getJournalFilters(licenses, apc)
+        return self.getJournalsQuery(f"{identifier_pattern}\n            {filters}", projection)
+
+class AsyncQueryHandler(QueryHandler):
+    # coroutine version of a query handler: the synchronous handler it wraps provides the queries and the decoding
+    def __init__(self, handler: QueryHandler):
+        super().__init__()
+        self.handler = handler
 
-        SELECT ?id ?title ?languages ?publisher ?seal ?license ?apc
-        WHERE {
-            ?s rdf:type schema:Periodical .
-            ?s schema:identifier ?id . 
-            ?s schema:name ?title . 
-            ?s schema:inLanguage ?languages .
-            ?s schema:publisher ?publisher .
-            ?s schema:hasDOAJSeal ?seal .
-            ?s schema:license ?license .
-            ?s schema:hasAPC ?apc .
-            
-            FILTER (?seal = true)
-        }
-        """
+    @property
+    def queryType(self) -> str:
+        return self.handler.queryType
+
+    def getHandler(self) -> QueryHandler:
+        return self.handler
+
+    def getErrorCount(self) -> int: # the wrapped handler reports the errors of the queries it runs
+        return self.errorCount + self.handler.getErrorCount()
+
+    def setDbPathOrUrl(self, pathOrUrl: str) -> bool:
+        # the wrapped handler decides which databases it can read
+        if not self.handler.setDbPathOrUrl(pathOrUrl):
+            return False
+        self.dbPathOrUrl = self.handler.getDbPathOrUrl()
+        return True
+
+class AsyncJournalQueryHandler(AsyncQueryHandler):
+    # the queries go through a non-blocking HTTP session, so many of them can wait for Blazegraph at the same time
+    def __init__(self):
+        super().__init__(JournalQueryHandler())
+        self.session = AsyncSPARQLSession()
+
+    def getResultFormat(self) -> str:
+        return self.handler.getResultFormat()
+
+    def setResultFormat(self, resultFormat: str) -> bool:
+        return self.handler.setResultFormat(resultFormat)
+
+    async def close(self):
+        await self.session.close()
+
+    async def runQuery(self, query: str) -> pd.DataFrame:
+        if isEmbeddedStore(self.getDbPathOrUrl()): # rdflib is synchronous
+            return await asyncio.to_thread(self.handler.runQuery, query)
+        data = await self.session.post(self.getDbPathOrUrl(), query.encode("utf-8"), self.handler.getQueryHeaders())
+        return self.handler.decodeResults(data)
+
+    async def selectJournals(self, create_query, *args) -> pd.DataFrame:
         try:
-            journal_DOAJ_df = sparql_dataframe.get(endpoint, query, True).rename(columns={"id": "journal-ids"})
-            return journal_DOAJ_df
-        
+            journals_df = self.handler.dropEmptyGroup(await self.runQuery(create_query(*args))).rename(columns={"id": "journal-ids"})
+            return self.handler.uniqueLanguages(journals_df)
         except Exception as e:
             self.unexpectedDatabaseError(e)
             return pd.DataFrame()
 
+    async def getById(self, id: str) -> pd.DataFrame:
+        journals_df = await self.getByIds([id])
+        if journals_df.empty:
+            return pd.DataFrame()
+        return journals_df.reset_index(drop=True)
+
+    async def hasIssnIndex(self) -> bool:
+        key = (self.getDbPathOrUrl(), getDataVersion(self.getDbPathOrUrl()))
+        if self.handler.issnIndex is None or self.handler.issnIndex[0] != key:
+            try:
+                self.handler.issnIndex = (key, (await self.runQuery(self.handler.getIssnIndexQuery())).empty)
+            except Exception: # not cached: the lookup query reports the error
+                return False
+        return self.handler.issnIndex[1]
+
+    async def getByIds(self, ids: Iterable[str]) -> pd.DataFrame:
+        ids = list(dict.fromkeys(ids))
+        exact = await self.hasIssnIndex()
+        try: # the batches are sent at the same time
+            journals_dfs = await asyncio.gather(*(self.runQuery(query) for query in self.handler.getJournalMatchQueries(ids, exact)))
+        except Exception as e:
+            self.unexpectedDatabaseError(e)
+            return pd.DataFrame(columns=["journal-ids", "title", "languages", "publisher", "seal", "license", "apc"])
+        return self.handler.combineJournalMatches(ids, journals_dfs, exact)
+
+    async def getJournalById(self, id: str) -> pd.DataFrame:
+        exact = await self.hasIssnIndex()
+        return await self.selectJournals(self.handler.getJournalByIdQuery, id, exact)
+
+    async def getAllJournals(self, projection: str = "full") -> pd.DataFrame:
+        return await self.selectJournals(self.handler.getAllJournalsQuery, projection)
+
+    def getTextIndexPath(self) -> Optional[str]:
+        return self.handler.getTextIndexPath()
+
+    def setTextIndexPath(self, textIndexPath: Optional[str]) -> bool:
+        return self.handler.setTextIndexPath(textIndexPath)
+
+    async def getJournalsWithTitle(self, partialTitle: str, limit: Optional[int] = None, projection: str = "full") -> pd.DataFrame:
+        return await self.searchJournals("title", partialTitle, limit, projection, self.handler.getJournalsWithTitleQuery)
+
+    async def getJournalsPublishedBy(self, partialName: str, limit: Optional[int] = None, projection: str = "full") -> pd.DataFrame:
+        return await self.searchJournals("publisher", partialName, limit, projection, self.handler.getJournalsPublishedByQuery)
+
+    async def searchJournals(self, column: str, text: str, limit: Optional[int], projection: str, create_query) -> pd.DataFrame:
+        # the text index is searched off the event loop, then the journals it found are read in parallel batches
+        try:
+            subjects = await asyncio.to_thread(self.handler.searchJournalText, column, text, limit)
+            if subjects is not None:
+                journals_dfs = await asyncio.gather(*(self.runQuery(query) for query in self.handler.getJournalsBySubjectsQueries(subjects, projection)))
+                return self.handler.orderJournalsBySubjects(subjects, journals_dfs)
+        except Exception as e:
+            self.unexpectedDatabaseError(e)
+            return pd.DataFrame()
+        return self.handler.limitJournals(await self.selectJournals(create_query, text, projection), limit)
+
+    async def getJournalsWithLicense(self, licenses: set[str], projection: str = "full") -> pd.DataFrame:
+        return await self.selectJournals(self.handler.getJournalsWithLicenseQuery, licenses, projection)
+
+    async def getJournalsWithAPC(self, projection: str = "full") -> pd.DataFrame:
+        return await self.selectJournals(self.handler.getJournalsWithAPCQuery, projection)
+
+    async def getJournalsWithDOAJSeal(self, projection: str = "full") -> pd.DataFrame:
+        return await self.selectJournals(self.handler.getJournalsWithDOAJSealQuery, projection)
+
+    async def getStatistics(self) -> pd.DataFrame:
+        statistics_df = getDataStatistics(self.getDbPathOrUrl())
+        if statistics_df is not None:
+            return statistics_df
+        try:
+            counts_df = await self.runQuery(self.handler.getStatisticsQuery())
+        except Exception as e:
+            self.unexpectedDatabaseError(e)
+            return pd.DataFrame(columns=["kind", "value", "count"])
+        if counts_df.empty:
+            return pd.DataFrame(columns=["kind", "value", "count"])
+        statistics_df = countJournalStatistics(counts_df)
+        setDataStatistics(self.getDbPathOrUrl(), statistics_df)
+        return statistics_df
+
+    async def getFilteredJournals(self, identifiers: Optional[Iterable[str]] = None, licenses: Optional[Iterable[str]] = None, 
+                                  apc: Optional[bool] = None, projection: str = "full") -> pd.DataFrame:
+        exact = identifiers is not None and await self.hasIssnIndex()
+        try:
+            journals_dfs = await asyncio.gather(*(self.runQuery(query) for query in self.handler.getFilteredJournalsQueries(identifiers, licenses, apc, exact, projection)))
+        except Exception as e:
+            self.unexpectedDatabaseError(e)
+            return pd.DataFrame()
+        return self.handler.combineFilteredJournals(journals_dfs)
+
+    async def getFilteredJournalsPage(self, licenses: Optional[Iterable[str]] = None, apc: Optional[bool] = None, 
+                                      after: Optional[str] = None, page_size: int = 1000) -> pd.DataFrame:
+        return await self.selectJournals(self.handler.getFilteredJournalsPageQuery, licenses, apc, after, page_size)
+
+class AsyncCategoryQueryHandler(AsyncQueryHandler):
+    # sqlite3 has no asynchronous interface: the queries run on a dedicated executor, one thread per pooled connection
+    def __init__(self):
+        super().__init__(CategoryQueryHandler())
+        self.executor = ThreadPoolExecutor(max_workers=self.handler.poolSize, thread_name_prefix="AsyncCategoryQueryHandler")
+
+    async def close(self):
+        self.executor.shutdown(wait=False)
+        self.executor = ThreadPoolExecutor(max_workers=self.handler.poolSize, thread_name_prefix="AsyncCategoryQueryHandler")
+        self.handler.close()
+
+    async def runInExecutor(self, method_name: str, *args) -> pd.DataFrame:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, getattr(self.handler, method_name), *args)
+
+    async def getById(self, id: str) -> pd.DataFrame:
+        return await self.runInExecutor("getById", id)
+
+    async def getByIds(self, ids: Iterable[str]) -> pd.DataFrame:
+        return await self.runInExecutor("getByIds", list(ids))
+
+    async def getAllCategories(self) -> pd.DataFrame:
+        return await self.runInExecutor("getAllCategories")
+
+    async def getAllAreas(self) -> pd.DataFrame:
+        return await self.runInExecutor("getAllAreas")
+
+    async def getAllCategoriesPage(self, after: Optional[str] = None, page_size: int = 1000) -> pd.DataFrame:
+        return await self.runInExecutor("getAllCategoriesPage", after, page_size)
+
+    async def getAllAreasPage(self, after: Optional[str] = None, page_size: int = 1000) -> pd.DataFrame:
+        return await self.runInExecutor("getAllAreasPage", after, page_size)
+
+    async def getCategoriesWithQuartile(self, quartiles: Optional[set[str]]) -> pd.DataFrame:
+        return await self.runInExecutor("getCategoriesWithQuartile", quartiles)
+
+    async def getCategoriesAssignedToAreas(self, area_ids: set[str]) -> pd.DataFrame:
+        return await self.runInExecutor("getCategoriesAssignedToAreas", area_ids)
+
+    async def getAreasAssignedToCategories(self, category_ids: set[str]) -> pd.DataFrame:
+        return await self.runInExecutor("getAreasAssignedToCategories", category_ids)
+
+    async def getCategoryQuartiles(self) -> pd.DataFrame:
+        return await self.runInExecutor("getCategoryQuartiles")
+
+    async def getStatistics(self) -> pd.DataFrame:
+        return await self.runInExecutor("getStatistics")
+
+    async def getJournalIdentifiers(self, category_ids: Optional[Iterable[str]] = None, quartiles: Optional[Iterable[str]] = None, 
+                                    area_ids: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        return await self.runInExecutor("getJournalIdentifiers", category_ids, quartiles, area_ids)
+
+class EntityCache:
+    # bounded LRU map from a canonical id to the entity built for it, with an optional time to live in seconds
+    def __init__(self, maxSize: int = 50000, ttl: Optional[float] = None):
+        self.maxSize = maxSize
+        self.ttl = ttl
+        self.entries: OrderedDict[str, tuple[float, IdentifiableEntity]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.stamp = None # the data versions the cached entities were built from
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def getKey(self, id: str) -> str:
+        return id.strip().casefold() # the lookups are case insensitive in both databases
+
+    def get(self, id: str) -> Optional[IdentifiableEntity]:
+        key = self.getKey(id)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[0] > self.ttl:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, id: str, entity: IdentifiableEntity):
+        key = self.getKey(id)
+        with self.lock:
+            self.entries[key] = (time.monotonic(), entity)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxSize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def validate(self, stamp: tuple):
+        # drops everything when the data (or the handlers) the entities come from changed
+        with self.lock:
+            if stamp != self.stamp:
+                self.entries.clear()
+                self.stamp = stamp
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.stamp = None
+
+    def getStats(self) -> dict[str, int]:
+        with self.lock:
+            return {"size": len(self.entries), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
 class BasicQueryEngine:
     def __init__(self): # Ila 
         self.journalQuery = []
         self.categoryQuery = []
+        self.entityCache = EntityCache()
+        self.parallelMode = False # True to call all the handlers at the same time on a thread pool
+        self.handlerTimeout = None # seconds each handler has to answer in parallel mode, None to wait for all
+        self.executor = None
+
+    def getEntityCache(self) -> EntityCache:
+        return self.entityCache
+
+    def setEntityCache(self, entityCache: EntityCache) -> bool:
+        if not isinstance(entityCache, EntityCache):
+            return False
+        self.entityCache = entityCache
+        return True
+
+    def getParallelMode(self) -> bool:
+        return self.parallelMode
+
+    def setParallelMode(self, parallelMode: bool) -> bool:
+        if not isinstance(parallelMode, bool):
+            return False
+        self.parallelMode = parallelMode
+        return True
+
+    def getHandlerTimeout(self) -> Optional[float]:
+        return self.handlerTimeout
+
+    def setHandlerTimeout(self, handlerTimeout: Optional[float]) -> bool:
+        if handlerTimeout is not None and (not isinstance(handlerTimeout, (int, float)) or isinstance(handlerTimeout, bool) or handlerTimeout <= 0):
+            return False
+        self.handlerTimeout = handlerTimeout
+        return True
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def collectFrames(self, handlers: list[QueryHandler], method_name: str, *args) -> list[pd.DataFrame]:
+        # calls the same method of every handler and returns their frames in registration order: one handler after
+        # the other, or in parallel mode all at once, so that the slowest handler (not their sum) sets the latency
+        if not self.parallelMode or len(handlers) < 2:
+            return [getattr(handler, method_name)(*args) for handler in handlers]
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(thread_name_prefix="QueryEngine")
+        futures = [self.executor.submit(getattr(handler, method_name), *args) for handler in handlers]
+        deadline = None if self.handlerTimeout is None else time.monotonic() + self.handlerTimeout
+
+        frames = []
+        for handler, future in zip(handlers, futures):
+            try:
+                frames.append(future.result(timeout=None if deadline is None else max(deadline - time.monotonic(), 0)))
+            except TimeoutError: # the late handler is left out of this result
+                future.cancel()
+                print(f"Timeout during '{method_name}' ({handler.queryType}): no answer from {handler.getDbPathOrUrl()} in {self.handlerTimeout} seconds")
+                handler.errorCount += 1
+                frames.append(pd.DataFrame())
+            except Exception as e:
+                print(f"Unexpected error during '{method_name}' ({handler.queryType}) [{type(e).__name__}]: {e}")
+                handler.errorCount += 1
+                frames.append(pd.DataFrame())
+        return frames
+
+    def getDataStamp(self) -> tuple:
+        # the handlers in use, their databases and how many uploads each database had
+        return tuple((id(handler), handler.getDbPathOrUrl(), getDataVersion(handler.getDbPathOrUrl())) 
+                     for handler in self.journalQuery + self.categoryQuery)
+
+    def getErrorCount(self) -> int:
+        # failed queries of the handlers in use, to tell a failure from an empty result
+        return sum(handler.getErrorCount() for handler in self.journalQuery + self.categoryQuery)
 
     def cleanJournalHandlers(self) -> bool: # Ila
         self.journalQuery = []
@@ -758,239 +2884,322 @@ class BasicQueryEngine:
                 print(f"Unexpected error during getEntityById: {e}")
                 return None
 
+        return self.getEntitiesByIds([id]).get(id)
+
+    def getEntitiesByIds(self, ids: Iterable[str]) -> dict[str, IdentifiableEntity]:
+        # bulk version of getEntityById: each handler is asked once (through getByIds) for all the ids 
+        # still missing, and the result maps every id that was found to its entity
+        ids, entities = self.getCachedEntities(ids)
+        if not ids:
+            return entities
+
+        journal_ids, other_ids = self.splitJournalIds(ids)
+        journal_rows = {}
+        if journal_ids:
+            journal_rows = self.mergeRows(self.collectFrames(self.journalQuery, "getByIds", journal_ids))
+        category_rows = {}
+        if journal_rows or other_ids:
+            category_rows = self.mergeRows(self.collectFrames(self.categoryQuery, "getByIds", list(journal_rows) + other_ids))
+        return self.createEntities(ids, other_ids, journal_rows, category_rows, entities)
+
+    def getCachedEntities(self, ids: Iterable[str]) -> tuple[list[str], dict[str, IdentifiableEntity]]:
+        # the ids still to be looked up and the entities found in the cache
+        ids = list(dict.fromkeys(str(id) for id in ids if isinstance(id, str) or id))
+        self.entityCache.validate(self.getDataStamp())
+        entities = {}
+        for id in ids: # repeated lookups are answered from memory
+            entity = self.entityCache.get(id)
+            if entity is not None:
+                entities[id] = entity
+        return [id for id in ids if id not in entities], entities
+
+    def splitJournalIds(self, ids: list[str]) -> tuple[list[str], list[str]]:
         journal_id_pattern = re.compile(r'^\d{4}-\d{3,4}X?(\s*,\s*\d{4}-\d{3,4}X?)*$')
+        journal_ids = [id for id in ids if journal_id_pattern.match(id) is not None]
+        other_ids = [id for id in ids if journal_id_pattern.match(id) is None]
+        return journal_ids, other_ids
+
+    def mergeRows(self, dfs: list[pd.DataFrame]) -> dict[str, dict]:
+        rows = {}
+        for df in dfs:
+            for id, row in df.to_dict("index").items():
+                rows.setdefault(id, row) # the first handler with a match wins
+        return rows
+
+    def createEntities(self, ids: list[str], other_ids: list[str], journal_rows: dict[str, dict], 
+                       category_rows: dict[str, dict], entities: dict[str, IdentifiableEntity]) -> dict[str, IdentifiableEntity]:
+        for id in ids:
+            if id in journal_rows: # journals without a match in the category handlers have no categories/areas
+                entities[id] = self.createJournal(journal_rows[id], category_rows.get(id))
+            elif id in other_ids and id in category_rows:
+                category_row = category_rows[id]
+                if category_row["entity-type"] == "category":
+                    entities[id] = getSharedCategory(category_row["category"], category_row["quartile"])
+                elif category_row["entity-type"] == "area":
+                    entities[id] = getSharedArea(category_row["area"])
+            if id in entities:
+                self.entityCache.put(id, entities[id])
+        return entities
+
+    def createJournal(self, journal_row: dict, category_row: Optional[dict]) -> Journal:
+        ids_list = [id_.strip() for id_ in journal_row["journal-ids"].split(",")]
+        languages_list = [lang.strip() for lang in journal_row["languages"].split(",")]
+
+        journal = Journal(
+            ids_list,
+            journal_row["title"],
+            languages_list,
+            journal_row["publisher"],
+            bool(journal_row["seal"]),
+            journal_row["license"],
+            bool(journal_row["apc"])
+        )
 
-        if journal_id_pattern.match(id) is not None:  
-            journal_found = False
-
-            for journalQueryHandler in self.journalQuery:
-                journal_object = journalQueryHandler.getById(id)
-                
-                if journal_object.empty:
-                    
-                    journal_object = journalQueryHandler.data[
-                        journalQueryHandler.data["journal-ids"].str.contains(id, regex=False, na=False)
-                    ]
-                
-                if not journal_object.empty:
-                    journal_found = True
-                    journal_object = journal_object.iloc[0]
-                    break
-
-            if not journal_found:
-                return None
-            
-            ids_list = [id_.strip() for id_ in journal_object["journal-ids"].split(",")]
-            languages_list = [lang.strip() for lang in journal_object["languages"].split(",")]
-
-            journal = Journal(
-                ids_list,
-                journal_object["title"],
-                languages_list,
-                journal_object["publisher"],
-                bool(journal_object["seal"]),
-                journal_object["license"],
-                bool(journal_object["apc"])
-            )
-
-            matching_category_data_found = False
-            journal_category_data = ""
-
-            for categoryQueryHandler in self.categoryQuery:
-                journal_category_data = categoryQueryHandler.getById(id)
-                if not journal_category_data.empty:
-                    matching_category_data_found = True
-                    journal_category_data = journal_category_data.iloc[0]
-                    break
-
-            if matching_category_data_found:
-                categories_with_quartiles = journal_category_data["categories-with-quartiles"]
-                area_values = journal_category_data["areas"]
-
-                for category_value, quartile_value in categories_with_quartiles.items():
-                    category = Category(category_value, quartile_value)
-                    journal.addCategory(category)
-
-                for area_value in area_values:
-                    area = Area(area_value)
-                    journal.addArea(area)
-
-            return journal
-
-        else:
-            for categoryQueryHandler in self.categoryQuery:
-                category_object = categoryQueryHandler.getById(id)
-                
-                if "category" in category_object.columns and not category_object["category"].isnull().all():
-                    category = category_object.iloc[0]
-                    return Category(category["category"], category["quartile"])
-                
-                if "area" in category_object.columns and not category_object["area"].isnull().all():
-                    area = category_object.iloc[0]
-                    return Area(area["area"])
-
-            return None
-
-
-    def getAllJournals(self) -> list[Journal]: # * Ila
+        if category_row is not None and category_row["entity-type"] == "journal":
+            for category_value, quartile_value in category_row["categories-with-quartiles"].items():
+                journal.addCategory(getSharedCategory(category_value, quartile_value))
+
+            for area_value in category_row["areas"]:
+                journal.addArea(getSharedArea(area_value))
+
+        return journal
+
+    def createJournals(self, journals_df: pd.DataFrame) -> JournalCollection:
+        # builds the journals straight from the rows returned by a journal handler: only their categories and areas 
+        # are fetched, with a single getByIds query per category handler, and joined to the rows with pandas
+        journals_df, journals, missing_ids = self.prepareJournals(journals_df)
+        if not missing_ids:
+            return self.createJournalColumns(journals_df, journals)
+        return self.joinJournals(journals_df, journals, self.collectFrames(self.categoryQuery, "getByIds", missing_ids))
+
+    def prepareJournals(self, journals_df: pd.DataFrame) -> tuple[pd.DataFrame, dict[str, Optional[Journal]], list[str]]:
+        # one row per journal, the journals already in the cache and the ids of the others
+        self.entityCache.validate(self.getDataStamp())
+        if journals_df["journal-ids"].duplicated().any(): # one row per language
+            aggregations = {column: "first" for column in journals_df.columns if column != "journal-ids"}
+            aggregations["languages"] = lambda languages: ", ".join(dict.fromkeys(", ".join(languages).split(", ")))
+            journals_df = journals_df.groupby("journal-ids", sort=False, as_index=False).agg(aggregations)
+
+        journal_ids = journals_df["journal-ids"].tolist()
+        journals = {id: self.entityCache.get(id) for id in journal_ids}
+        return journals_df, journals, [id for id in journal_ids if journals[id] is None]
+
+    def joinJournals(self, journals_df: pd.DataFrame, journals: dict[str, Optional[Journal]], category_dfs: list[pd.DataFrame]) -> JournalCollection:
+        category_columns = ["entity-type", "categories-with-quartiles", "areas"]
+        categories_df = pd.concat([df[category_columns] for df in category_dfs if not df.empty] or [pd.DataFrame(columns=category_columns)])
+        categories_df = categories_df[~categories_df.index.duplicated()] # the first handler with a match wins
+        return self.createJournalColumns(journals_df.join(categories_df, on="journal-ids"), journals)
+
+    def createJournalColumns(self, journals_df: pd.DataFrame, journals: dict[str, Optional[Journal]]) -> JournalCollection:
+        # the rows as a JournalCollection: the cached journals are reused, the others are built (and cached) when used
+        rows = {name: journals_df[name].tolist() for name in JournalCollection.columnNames}
+        cached = [journals[id] for id in rows["journal-ids"]]
+        no_column = [None] * len(cached)
+        category_columns = [journals_df[column].tolist() if column in journals_df.columns else no_column 
+                            for column in ("entity-type", "categories-with-quartiles", "areas")]
+        categories = []
+        areas = []
+        for journal, entity_type, categories_with_quartiles, area_values in zip(cached, *category_columns):
+            if journal is not None:
+                categories.append(journal.getCategories())
+                areas.append(journal.getAreas())
+            elif entity_type == "journal": # journal and category values are in the same joined row
+                categories.append([getSharedCategory(category_value, quartile_value) 
+                                   for category_value, quartile_value in categories_with_quartiles.items()])
+                areas.append([getSharedArea(area_value) for area_value in area_values])
+            else: # journals without a match in the category handlers have no categories/areas
+                categories.append([])
+                areas.append([])
+        stamp = self.entityCache.stamp
+        return createJournalCollection(rows, categories, areas, cached, 
+                                       lambda journal_row, category_row: self.createCachedJournal(stamp, journal_row, category_row))
+
+    def createCachedJournal(self, stamp: tuple, journal_row: dict, category_row: Optional[dict]) -> Journal:
+        # createJournal for a JournalCollection: the journal is cached if the data has not changed since its rows were read
+        journal = self.createJournal(journal_row, category_row)
+        if self.entityCache.stamp == stamp:
+            self.entityCache.put(journal_row["journal-ids"], journal)
+        return journal
+
+    def uniqueJournals(self, collections: list[JournalCollection]) -> JournalCollection:
+        # uniqueEntities for the collections of the handlers, on their identity keys
+        return concatJournalCollections(collections).unique()
+
+    def uniqueEntities(self, entities: Iterable[Optional[IdentifiableEntity]]) -> list[IdentifiableEntity]:
+        # a dictionary used as an ordered set: the first of the equal entities is kept, in linear time
+        return list(dict.fromkeys(entity for entity in entities if entity is not None))
+
+    def getAllJournals(self) -> JournalCollection: # * Ila
         # it returns a data frame containing all the journals that have, as a publisher, any that matches (even partially) with the input string.
         all_journals = []
 
-        for journalQueryHandler in self.journalQuery:
-            journals_df = journalQueryHandler.getAllJournals()
+        for journals_df in self.collectFrames(self.journalQuery, "getAllJournals"):
             if journals_df.empty: # it the columns is empty, ignore it, go on 
                 continue
 
-            for journal_ids in journals_df["journal-ids"]:
-                journal = self.getEntityById(journal_ids)
-                if journal not in all_journals:
-                    all_journals.append(journal)
-        return all_journals
+            all_journals.append(self.createJournals(journals_df)) # built from the rows, no lookup per row
+        return self.uniqueJournals(all_journals)
 
-    def getJournalsWithTitle(self, partialTitle: str) -> list[Journal]: # * Martina
+    def getJournalsWithTitle(self, partialTitle: str, limit: Optional[int] = None) -> JournalCollection: # * Martina
         journals_with_title = []
 
-        for journalQueryHandler in self.journalQuery:
-            journals_df = journalQueryHandler.getJournalsWithTitle(partialTitle)
+        for journals_df in self.collectFrames(self.journalQuery, "getJournalsWithTitle", partialTitle, limit):
             if journals_df.empty:   
                 continue
 
-            for journal_ids in journals_df["journal-ids"]:
-                journal = self.getEntityById(journal_ids)
-                if journal is not None and journal not in journals_with_title:
-                    journals_with_title.append(journal)
-
-        return journals_with_title
-
-    def getAllJournals(self) -> list[Journal]: # * Ila
-        # it returns a data frame containing all the journals that have, as a publisher, any that matches (even partially) with the input string.
-        all_journals = []
+            journals_with_title.append(self.createJournals(journals_df)) # built from the rows, no lookup per row
 
-        for journalQueryHandler in self.journalQuery:
-            journals_df = journalQueryHandler.getAllJournals()
-            if journals_df.empty: # it the columns is empty, ignore it, go on 
-                continue
+        return self.uniqueJournals(journals_with_title)[:limit] # the best matches of the first handlers
 
-            for journal_ids in journals_df["journal-ids"]: # the journal-ids is a str for sure
-                journal = self.getEntityById(journal_ids)
-                if journal not in all_journals:
-                    all_journals.append(journal)
-        return all_journals
-    
-        
-    def getJournalsPublishedBy(self, partialName: str) -> list[Journal]: # * Nico
+    def getJournalsPublishedBy(self, partialName: str, limit: Optional[int] = None) -> JournalCollection: # * Nico
         journals_published_by = []
 
-        for journalQueryHandler in self.journalQuery:
-            journals_df = journalQueryHandler.getJournalsPublishedBy(partialName)
+        for journals_df in self.collectFrames(self.journalQuery, "getJournalsPublishedBy", partialName, limit):
             if journals_df.empty:   
                 continue
 
-            for journal_ids in journals_df["journal-ids"]:
-                journal = self.getEntityById(journal_ids)
-                if journal is not None and journal not in journals_published_by:
-                    journals_published_by.append(journal)
+            journals_published_by.append(self.createJournals(journals_df)) # built from the rows, no lookup per row
 
-        return journals_published_by
+        return self.uniqueJournals(journals_published_by)[:limit]
 
-    def getJournalsWithLicense(self, licenses: set[str]) -> list[Journal]: # * Rumana
+    def getJournalsWithLicense(self, licenses: set[str]) -> JournalCollection: # * Rumana
         journals_with_license = []
 
-        for journalQueryHandler in self.journalQuery: 
-            journals_df = journalQueryHandler.getJournalsWithLicense(licenses) 
+        for journals_df in self.collectFrames(self.journalQuery, "getJournalsWithLicense", licenses):
             if journals_df.empty:     
                 continue
 
-            for journal_ids in journals_df["journal-ids"]:
-                journal = self.getEntityById(journal_ids)
-                if journal is not None and journal not in journals_with_license:
-                    journals_with_license.append(journal)
+            journals_with_license.append(self.createJournals(journals_df)) # built from the rows, no lookup per row
 
-        return journals_with_license
+        return self.uniqueJournals(journals_with_license)
             
-    def getJournalsWithAPC(self) -> list[Journal]: # * Ila
+    def getJournalsWithAPC(self) -> JournalCollection: # * Ila
         # it returns a list of objects having class Journal containing all the journals in DOAJ that do specify an Article Processing Charge (APC).
         journals_with_APC = []
 
-        for journalQueryHandler in self.journalQuery: 
-            journals_df = journalQueryHandler.getJournalsWithAPC() 
+        for journals_df in self.collectFrames(self.journalQuery, "getJournalsWithAPC"):
             if journals_df.empty:     
                 continue
 
-            for journal_ids in journals_df["journal-ids"]:
-                journal = self.getEntityById(journal_ids)
-                if journal is not None and journal not in journals_with_APC:
-                    journals_with_APC.append(journal)
+            journals_with_APC.append(self.createJournals(journals_df)) # built from the rows, no lookup per row
 
-        return journals_with_APC
+        return self.uniqueJournals(journals_with_APC)
             
-    def getJournalsWithDOAJSeal(self) -> list[Journal]: # * Martina
+    def getJournalsWithDOAJSeal(self) -> JournalCollection: # * Martina
         journals_with_DOAJ_seal = []
 
-        for journalQueryHandler in self.journalQuery: 
-            journals_df = journalQueryHandler.getJournalsWithDOAJSeal() 
+        for journals_df in self.collectFrames(self.journalQuery, "getJournalsWithDOAJSeal"):
             if journals_df.empty:   
                 continue
 
-            for journal_ids in journals_df["journal-ids"]:
-                journal = self.getEntityById(journal_ids)
-                if journal is not None and journal not in journals_with_DOAJ_seal:
-                    journals_with_DOAJ_seal.append(journal)
+            journals_with_DOAJ_seal.append(self.createJournals(journals_df)) # built from the rows, no lookup per row
 
-        return journals_with_DOAJ_seal                         
+        return self.uniqueJournals(journals_with_DOAJ_seal)                         
 
     def getAllCategories(self) -> list[Category]: # * Nico
         all_categories = []
 
-        for categoryQueryHandler in self.categoryQuery:
-            categories_df = categoryQueryHandler.getAllCategories()
+        for categories_df in self.collectFrames(self.categoryQuery, "getAllCategories"):
             if categories_df.empty:
                 continue
 
+            entities = self.getEntitiesByIds(categories_df["category"]) # one bulk lookup instead of one per row
             for category_id in categories_df["category"]:
-                category = self.getEntityById(category_id)
-                if category is not None and category not in all_categories:
-                    all_categories.append(category)
+                category = entities.get(category_id)
+                all_categories.append(category)
 
-        return all_categories
+        return self.uniqueEntities(all_categories)
     
     def getAllAreas(self) -> list[Area]: # * Rumana
         all_areas = []
 
-        for categoryQueryHandler in self.categoryQuery:
-            areas_df = categoryQueryHandler.getAllAreas()
+        for areas_df in self.collectFrames(self.categoryQuery, "getAllAreas"):
             if areas_df.empty:
                 continue
 
+            entities = self.getEntitiesByIds(areas_df["area"]) # one bulk lookup instead of one per row
             for area_id in areas_df["area"]:
-                entity = self.getEntityById(area_id)
-                area = Area(entity.getIds()[0]) if isinstance(entity, Category) else entity # dealing with cases where the area and category have the same name
-                if area is not None and area not in all_areas:
-                    all_areas.append(area)
-
-        return all_areas
+                entity = entities.get(area_id)
+                area = getSharedArea(entity.getIds()[0]) if isinstance(entity, Category) else entity # dealing with cases where the area and category have the same name
+                all_areas.append(area)
+
+        return self.uniqueEntities(all_areas)
+
+    def iterAllJournals(self, page_size: int = 1000) -> Iterator[Journal]:
+        # generator version of getAllJournals: each handler is read one page at a time and the journals of a page are 
+        # yielded before the next one is requested, so the first ones arrive after a single small query
+        seen = self.getSeenKeys(self.journalQuery)
+        for handler in self.journalQuery:
+            for journals_df in self.iterPages(handler, "getFilteredJournalsPage", "s", page_size, None, None):
+                yield from self.iterUnseen(self.createJournals(journals_df.drop(columns="s")), seen)
+
+    def iterAllCategories(self, page_size: int = 1000) -> Iterator[Category]:
+        seen = self.getSeenKeys(self.categoryQuery)
+        for handler in self.categoryQuery:
+            for categories_df in self.iterPages(handler, "getAllCategoriesPage", "category", page_size):
+                entities = self.getEntitiesByIds(categories_df["category"])
+                yield from self.iterUnseen(map(entities.get, categories_df["category"]), seen)
+
+    def iterAllAreas(self, page_size: int = 1000) -> Iterator[Area]:
+        seen = self.getSeenKeys(self.categoryQuery)
+        for handler in self.categoryQuery:
+            for areas_df in self.iterPages(handler, "getAllAreasPage", "area", page_size):
+                entities = self.getEntitiesByIds(areas_df["area"])
+                areas = (getSharedArea(entity.getIds()[0]) if isinstance(entity, Category) else entity # as in getAllAreas
+                         for entity in map(entities.get, areas_df["area"]))
+                yield from self.iterUnseen(areas, seen)
+
+    def iterPages(self, handler: QueryHandler, method_name: str, key_column: str, page_size: int, *args) -> Iterator[pd.DataFrame]:
+        # keyset pagination: each page starts after the last key of the previous one, so it costs its own rows 
+        # wherever it is (no OFFSET to skip); an empty or short page is the last one
+        after = None
+        while True:
+            page_df = getattr(handler, method_name)(*args, after, page_size)
+            if page_df.empty:
+                return
+            yield page_df
+            if page_df[key_column].nunique() < page_size:
+                return
+            after = page_df[key_column].iloc[-1]
+
+    def getSeenKeys(self, handlers: list[QueryHandler], plan: Optional[dict] = None) -> Optional[set]:
+        # the keyset pages of a single handler never repeat a subject or a name, so the keys of the entities yielded 
+        # so far are only kept when another handler, or another page of pushed identifiers, can return the same entity
+        if len(handlers) > 1 or (plan is not None and plan["order"] == "categories-first" and plan["join"] == "values-probe"):
+            return set()
+        return None
+
+    def iterUnseen(self, entities: Iterable[Optional[IdentifiableEntity]], seen: Optional[set]) -> Iterator[IdentifiableEntity]:
+        # uniqueEntities for a stream: the identity keys of the entities already yielded, or (seen is None) of this page only
+        if seen is None:
+            seen = set()
+        for entity in entities:
+            if entity is None:
+                continue
+            key = (type(entity).__name__, entity.getIdentityKey())
+            if key not in seen:
+                seen.add(key)
+                yield entity
                 
     def getCategoriesWithQuartile(self, quartiles: set[str] = None) -> list[Category]: # * Ila
         #  it returns a list of objects having class Category containing all the categories in Scimago Journal Rank having specified, as input, particular quartiles, with no repetitions. In case the input collection of quartiles is empty, it is like all quartiles are actually specified.
         categories_with_quartiles = [] 
 
-        for categoryQueryHandler in self.categoryQuery:
-            categories_df = categoryQueryHandler.getCategoriesWithQuartile(quartiles)
+        for categories_df in self.collectFrames(self.categoryQuery, "getCategoriesWithQuartile", quartiles):
             if categories_df.empty:
                 continue
 
+            entities = self.getEntitiesByIds(categories_df["category"]) # one bulk lookup instead of one per row
             for category_id in categories_df["category"]:
-                category = self.getEntityById(category_id)
-                if category is not None and category not in categories_with_quartiles: # in the case that a quartile exists in a separate handler
-                    categories_with_quartiles.append(category)
+                category = entities.get(category_id)
+                categories_with_quartiles.append(category) # in the case that a quartile exists in a separate handler
 
-        return categories_with_quartiles
+        return self.uniqueEntities(categories_with_quartiles)
         
     def getCategoriesAssignedToAreas(self, areas_ids: set[str]) -> list[Category]: # * Martina
         assigned_categories = []
 
-        for categoryQueryHandler in self.categoryQuery: 
-            areas_df = categoryQueryHandler.getCategoriesAssignedToAreas(areas_ids)
+        for areas_df in self.collectFrames(self.categoryQuery, "getCategoriesAssignedToAreas", areas_ids):
             
             if areas_df.empty:
                 continue
@@ -999,18 +3208,17 @@ class BasicQueryEngine:
             match_area = areas_df["area"].astype(str).str.lower().isin(input_areas)
             areas = areas_df[match_area]
             
+            entities = self.getEntitiesByIds(areas["category"]) # one bulk lookup instead of one per row
             for category_id in areas["category"]:
-                category = self.getEntityById(category_id)
-                if category is not None and category not in assigned_categories:
-                    assigned_categories.append(category)
+                category = entities.get(category_id)
+                assigned_categories.append(category)
 
-        return assigned_categories
+        return self.uniqueEntities(assigned_categories)
             
     def getAreasAssignedToCategories(self, category_ids: set[str]) -> list[Area]: # * Nico
         assigned_areas = []
 
-        for categoryQueryHandler in self.categoryQuery:
-            categories_df = categoryQueryHandler.getAreasAssignedToCategories(category_ids)
+        for categories_df in self.collectFrames(self.categoryQuery, "getAreasAssignedToCategories", category_ids):
             if categories_df.empty:
                 continue
             
@@ -1018,24 +3226,211 @@ class BasicQueryEngine:
             categories_match = categories_df["category"].astype(str).str.lower().isin(input_categories)
             categories = categories_df[categories_match]
 
+            entities = self.getEntitiesByIds(categories["area"]) # one bulk lookup instead of one per row
             for area_id in categories["area"]:
-                entity = self.getEntityById(area_id)
-                area = Area(entity.getIds()[0]) if isinstance(entity, Category) else entity 
-                if area is not None and area not in assigned_areas: 
-                    assigned_areas.append(area)
+                entity = entities.get(area_id)
+                area = getSharedArea(entity.getIds()[0]) if isinstance(entity, Category) else entity 
+                assigned_areas.append(area)
 
-        return assigned_areas
+        return self.uniqueEntities(assigned_areas)
 
 class FullQueryEngine(BasicQueryEngine): 
     def __init__(self):
         super().__init__()
+        self.maxPushedIdentifiers = 2000 # above this, a VALUES block costs the triplestore more than a hash join in Python
+        self.statistics = None
+        self.statisticsStamp = None
+        self.latestPlan = contextvars.ContextVar("latestPlan") # the latest plan of each thread and asyncio task, for explain
 
-    def getJournalsInCategoriesWithQuartile(self, category_ids: set[str], quartiles: set[str]) -> list[Journal]: # * Nico
-        # ! The overall amount of journals returned is less (of a few units) than the one expected.
-        journals_in_categories = []
+    def getMaxPushedIdentifiers(self) -> int:
+        return self.maxPushedIdentifiers
 
+    def setMaxPushedIdentifiers(self, maxPushedIdentifiers: int) -> bool:
+        if not isinstance(maxPushedIdentifiers, int) or isinstance(maxPushedIdentifiers, bool) or maxPushedIdentifiers < 0:
+            return False
+        self.maxPushedIdentifiers = maxPushedIdentifiers
+        return True
+
+    def getStatistics(self) -> dict[str, pd.DataFrame]:
+        # the counts of all the handlers of each kind, read again after an upload
+        stamp = self.getDataStamp()
+        if self.statistics is None or self.statisticsStamp != stamp:
+            self.statistics = {"journals": mergeStatistics(self.collectFrames(self.journalQuery, "getStatistics")), 
+                               "categories": mergeStatistics(self.collectFrames(self.categoryQuery, "getStatistics"))}
+            self.statisticsStamp = stamp
+        return self.statistics
+
+    def getTargetQuartiles(self, quartiles: Optional[set[str]]) -> Optional[set[str]]:
+        if not quartiles or quartiles == {"Q1", "Q2", "Q3", "Q4"} or not quartiles.issubset({"Q1", "Q2", "Q3", "Q4"}):
+            return None
+        return quartiles
+
+    def getSelectivity(self, statistics_df: pd.DataFrame, kind: str, values: Iterable[Optional[str]], total: int, 
+                       contains: bool = False) -> float:
+        # share of the journals with one of the values (or with a value containing one of them)
+        counts_df = statistics_df[statistics_df["kind"] == kind]
+        targets = {None if value is None else str(value).casefold() for value in values}
+        keys = counts_df["value"].map(lambda value: None if pd.isna(value) else str(value).casefold())
+        if contains:
+            matches = keys.map(lambda key: key is not None and any(target in key for target in targets if target is not None))
+        else:
+            matches = keys.map(lambda key: key in targets)
+        return min(1.0, counts_df.loc[matches.astype(bool), "count"].sum() / total) if total else 0.0
+
+    def estimateRows(self, plan: dict, statistics: Optional[dict[str, pd.DataFrame]]) -> dict[str, Optional[int]]:
+        # journals expected from each store, with independent predicates; None without statistics
+        estimated = {"categories": None, "journals": None, "result": None}
+        if not statistics:
+            return estimated
+        categories_df, journals_df = statistics["categories"], statistics["journals"]
+        category_total = int(categories_df.loc[categories_df["kind"] == "journals", "count"].sum())
+        journal_total = int(journals_df.loc[journals_df["kind"] == "journals", "count"].sum())
+
+        if category_total:
+            rows = category_total
+            if plan["categories"]:
+                rows *= self.getSelectivity(categories_df, "category", plan["categories"], category_total)
+            if plan["quartiles"]:
+                rows *= self.getSelectivity(categories_df, "quartile", plan["quartiles"] + [None], category_total)
+            if plan["areas"]:
+                rows *= self.getSelectivity(categories_df, "area", plan["areas"], category_total)
+            estimated["categories"] = round(rows)
+        if journal_total:
+            rows = journal_total
+            if plan["licenses"]:
+                rows *= self.getSelectivity(journals_df, "license", plan["licenses"], journal_total, contains=True)
+            if plan["apc"] is not None:
+                rows *= self.getSelectivity(journals_df, "apc", [str(plan["apc"]).lower()], journal_total)
+            estimated["journals"] = round(rows)
+        if category_total and journal_total:
+            estimated["result"] = round(estimated["journals"] * estimated["categories"] / category_total)
+        return estimated
+
+    def planJournalQuery(self, category_ids: Optional[set[str]] = None, quartiles: Optional[set[str]] = None, 
+                         areas_ids: Optional[set[str]] = None, licenses: Optional[set[str]] = None, apc: Optional[bool] = None, 
+                         statistics: Optional[dict[str, pd.DataFrame]] = None) -> dict:
+        # each store gets its own predicates, and the statistics decide which one goes first and how the two are joined:
+        # - categories-first, values-probe: the identifiers qualifying in SQLite are sent to the triplestore in VALUES blocks
+        # - categories-first, hash-join: too many identifiers for that, so both stores filter on their own and the 
+        #   journals are matched against the identifiers in Python
+        # - journals-first, values-probe: the triplestore filters and the categories of what it returns are looked up
+        target_quartiles = self.getTargetQuartiles(quartiles)
+        plan = {"order": "journals-first", "join": "values-probe", 
+                "categories": sorted(category_ids) if category_ids else None, 
+                "quartiles": sorted(target_quartiles) if target_quartiles else None, 
+                "areas": sorted(areas_ids) if areas_ids else None, 
+                "licenses": sorted(licenses) if licenses else None, "apc": apc}
+        estimated = plan["estimated"] = self.estimateRows(plan, statistics)
+        plan["actual"] = dict.fromkeys(estimated)
+
+        if estimated["categories"] is None or estimated["journals"] is None: # no statistics: the named categories and areas go first
+            if category_ids or areas_ids:
+                plan["order"] = "categories-first"
+        elif (plan["categories"] or plan["quartiles"] or plan["areas"]) and estimated["categories"] <= estimated["journals"]:
+            plan["order"] = "categories-first"
+            if estimated["categories"] > self.maxPushedIdentifiers:
+                plan["join"] = "hash-join"
+        if plan["order"] == "categories-first" and plan["join"] == "values-probe" and estimated["result"] is not None:
+            estimated["journals"] = estimated["result"] # only the journals matching the identifiers are read
+        return plan
+
+    def getPlannedIdentifiers(self, plan: dict, identifiers_dfs: list[pd.DataFrame]) -> list[str]:
+        identifiers_dfs = [identifiers_df for identifiers_df in identifiers_dfs if not identifiers_df.empty]
+        plan["actual"]["categories"] = sum(identifiers_df["journal"].nunique() for identifiers_df in identifiers_dfs)
+        identifiers = list(dict.fromkeys(
+            str(identifier).upper() for identifiers_df in identifiers_dfs for identifier in identifiers_df["identifier"]
+        ))
+        if plan["join"] == "values-probe" and len(identifiers) > self.maxPushedIdentifiers: # more than the statistics said
+            plan["join"] = "hash-join"
+        return identifiers
+
+    def filterPlannedJournals(self, plan: dict, identifiers: Optional[list[str]], journals_dfs: list[pd.DataFrame]) -> list[pd.DataFrame]:
+        journals_dfs = [journals_df for journals_df in journals_dfs if not journals_df.empty]
+        plan["actual"]["journals"] = sum(journals_df["journal-ids"].nunique() for journals_df in journals_dfs)
+        if plan["join"] != "hash-join":
+            return journals_dfs
+
+        identifiers = set(identifiers)
+        joined_dfs = []
+        for journals_df in journals_dfs: # the same candidates as getByIds: all the ids, then each of them
+            journal_ids = journals_df["journal-ids"].astype(str).str.upper()
+            matches = journal_ids.map(lambda id: id in identifiers or not identifiers.isdisjoint(id.split(", ")))
+            if matches.any():
+                joined_dfs.append(journals_df[matches.astype(bool)])
+        return joined_dfs
+
+    def runJournalPlan(self, plan: dict) -> JournalCollection:
+        # a superset of the answer: the select methods still check every journal found
+        identifiers = None
+        if plan["order"] == "categories-first":
+            identifiers = self.getPlannedIdentifiers(plan, self.collectFrames(
+                self.categoryQuery, "getJournalIdentifiers", plan["categories"], plan["quartiles"], plan["areas"]
+            ))
+            if not identifiers:
+                return concatJournalCollections([])
+
+        pushed_identifiers = identifiers if plan["join"] == "values-probe" else None
+        journals_dfs = self.collectFrames(self.journalQuery, "getFilteredJournals", pushed_identifiers, plan["licenses"], plan["apc"])
+        journals = []
+        for journals_df in self.filterPlannedJournals(plan, identifiers, journals_dfs):
+            journals.append(self.createJournals(journals_df))
+        return self.uniqueJournals(journals)
+
+    def iterJournalPlan(self, plan: dict, page_size: int) -> Iterator[JournalCollection]:
+        # runJournalPlan one page at a time: the identifiers found in SQLite are sent page_size at a time, or else
+        # the triplestore is read with keyset pagination (and the pages are hash-joined with the identifiers, if any)
+        identifiers = None
+        if plan["order"] == "categories-first":
+            identifiers = self.getPlannedIdentifiers(plan, self.collectFrames(
+                self.categoryQuery, "getJournalIdentifiers", plan["categories"], plan["quartiles"], plan["areas"]
+            ))
+            if not identifiers:
+                return
+
+        if identifiers is not None and plan["join"] == "values-probe":
+            for start in range(0, len(identifiers), page_size):
+                journals_dfs = self.collectFrames(self.journalQuery, "getFilteredJournals", identifiers[start:start + page_size], 
+                                                  plan["licenses"], plan["apc"])
+                yield self.createPlannedJournals(plan, identifiers, journals_dfs)
+        else:
+            for handler in self.journalQuery:
+                for journals_df in self.iterPages(handler, "getFilteredJournalsPage", "s", page_size, plan["licenses"], plan["apc"]):
+                    yield self.createPlannedJournals(plan, identifiers, [journals_df.drop(columns="s")])
+
+    def createPlannedJournals(self, plan: dict, identifiers: Optional[list[str]], journals_dfs: list[pd.DataFrame]) -> JournalCollection:
+        return concatJournalCollections([self.createJournals(journals_df) 
+                                         for journals_df in self.filterPlannedJournals(plan, identifiers, journals_dfs)])
+
+    def finishPlan(self, method_name: str, plan: dict, journals: JournalCollection) -> JournalCollection:
+        plan["method"] = method_name
+        plan["actual"]["result"] = len(journals)
+        self.latestPlan.set(plan)
+        return journals
+
+    def explain(self, method_name: str, *args) -> dict:
+        # runs one of the mash-up methods and returns its plan, with the estimated and the actual number of journals
+        if method_name not in ("getJournalsInCategoriesWithQuartile", "getJournalsInAreasWithLicense", 
+                               "getDiamondJournalsInAreasAndCategoriesWithQuartile"):
+            print(f"No plan to explain for '{method_name}'")
+            return {}
+        token = self.latestPlan.set({})
+        try:
+            getattr(self, method_name)(*args)
+            return self.latestPlan.get()
+        finally:
+            self.latestPlan.reset(token)
+
+    def getJournalsInCategoriesWithQuartile(self, category_ids: set[str], quartiles: set[str]) -> JournalCollection: # * Nico
+        # ! The overall amount of journals returned is less (of a few units) than the one expected.
         target_categories = self.getAllCategories() if not category_ids else [self.getEntityById(category) for category in category_ids]
-        target_categories = list(filter(None, target_categories)) 
+        plan = self.planJournalQuery(category_ids=category_ids, quartiles=quartiles, statistics=self.getStatistics())
+        journals = self.selectJournalsInCategories(self.runJournalPlan(plan), target_categories, quartiles)
+        return self.finishPlan("getJournalsInCategoriesWithQuartile", plan, journals)
+
+    def selectJournalsInCategories(self, journals: Iterable[Journal], target_categories: list[Category], quartiles: set[str]) -> JournalCollection:
+        # checked on the columns of the collection: the journals are not built
+        journals = getJournalCollection(journals)
+        target_categories = set(filter(None, target_categories)) # hashed, for constant time membership tests
 
         if not quartiles or quartiles == {"Q1", "Q2", "Q3", "Q4"}:
             target_quartiles = None
@@ -1044,50 +3439,31 @@ class FullQueryEngine(BasicQueryEngine):
         else:
             target_quartiles = quartiles
 
-        for journal in self.getAllJournals():
-            journal_categories = journal.getCategories()
-            if journal_categories is None:
-                continue
-
-            for journal_category in journal_categories:
-                journal_category_quartile = journal_category.getQuartile()
-                category_is_match = journal_category in target_categories
-                quartiles_match = (
-                    target_quartiles is None 
-                    or journal_category_quartile is None 
-                    or journal_category_quartile in target_quartiles
-                )
-                
-                if category_is_match and quartiles_match and journal not in journals_in_categories:
-                    journals_in_categories.append(journal)
-                    break
-
-        return journals_in_categories
+        return journals.filter(journals.getCategoryMask(target_categories, target_quartiles)).unique()
     
-    def getJournalsInAreasWithLicense(self, areas_ids: set[str], licenses: set[str]) -> list[Journal]: # * Ila
+    def getJournalsInAreasWithLicense(self, areas_ids: set[str], licenses: set[str]) -> JournalCollection: # * Ila
         # it returns a list of objects having class Journal containing all the journals in DOAJ with at least one of the licenses specific as input, and that have at least one of the input areas specified in Scimago Journal Rank, with no repetitions. In case the input collection of areas/licenses are empty, it is like all areas/licenses are actually specified.
-        journals_with_licenses = []
-        
         target_areas = self.getAllAreas() if not areas_ids else [self.getEntityById(area) for area in areas_ids]
-        target_areas = list(filter(None, target_areas))
-
-        for journal in self.getJournalsWithLicense(licenses):
-            journal_areas = journal.getAreas() 
-            if journal_areas is None:
-                continue
-
-            for journal_area in journal_areas:
-                if journal not in journals_with_licenses and journal_area in target_areas: 
-                    journals_with_licenses.append(journal)
-                    break
-
-        return journals_with_licenses
+        plan = self.planJournalQuery(areas_ids=areas_ids, licenses=licenses, statistics=self.getStatistics())
+        journals = self.selectJournalsInAreas(self.runJournalPlan(plan), target_areas)
+        return self.finishPlan("getJournalsInAreasWithLicense", plan, journals)
+
+    def selectJournalsInAreas(self, journals: Iterable[Journal], target_areas: list[Area]) -> JournalCollection:
+        journals = getJournalCollection(journals)
+        target_areas = set(filter(None, target_areas))
+        return journals.filter(journals.getAreaMask(target_areas)).unique()
         
-    def getDiamondJournalsInAreasAndCategoriesWithQuartile(self, areas_ids: set[str], category_ids: set[str], quartiles: set[str]) -> list[Journal]:
-        diamond_journals = []
-
+    def getDiamondJournalsInAreasAndCategoriesWithQuartile(self, areas_ids: set[str], category_ids: set[str], quartiles: set[str]) -> JournalCollection:
         target_areas = self.getAllAreas() if not areas_ids else [self.getEntityById(area) for area in areas_ids] 
         target_categories = self.getAllCategories() if not category_ids else [self.getEntityById(category) for category in category_ids]
+        plan = self.planJournalQuery(category_ids=category_ids, quartiles=quartiles, areas_ids=areas_ids, apc=False, 
+                                     statistics=self.getStatistics())
+        journals = self.selectDiamondJournals(self.runJournalPlan(plan), target_areas, target_categories, quartiles)
+        return self.finishPlan("getDiamondJournalsInAreasAndCategoriesWithQuartile", plan, journals)
+
+    def selectDiamondJournals(self, journals: Iterable[Journal], target_areas: list[Area], target_categories: list[Category], 
+                              quartiles: set[str]) -> JournalCollection:
+        journals = getJournalCollection(journals)
         
         if not quartiles: 
             target_quartiles = None
@@ -1096,36 +3472,581 @@ class FullQueryEngine(BasicQueryEngine):
         else:
             target_quartiles = quartiles
 
-        target_areas = list(filter(None, target_areas)) 
-        target_categories = list(filter(None, target_categories))
+        target_areas = set(filter(None, target_areas)) 
+        target_categories = set(filter(None, target_categories))
 
-        for journal in filter(lambda j: not j.hasAPC(), self.getAllJournals()): 
-            valid_categories_and_quartiles = False
-            valid_areas = False
+        mask = ~journals.getColumn("apc")
+        mask &= journals.getAreaMask(target_areas)
+        mask &= journals.getCategoryMask(target_categories, target_quartiles)
+        return journals.filter(mask).unique() # per sicurezza
 
-            if target_areas is not None:
-                for journal_area in journal.getAreas():
-                    if journal_area in target_areas:
-                        valid_areas = True
-                        break
+    def iterJournalsInCategoriesWithQuartile(self, category_ids: set[str], quartiles: set[str], page_size: int = 1000) -> Iterator[Journal]:
+        target_categories = self.getAllCategories() if not category_ids else [self.getEntityById(category) for category in category_ids]
+        plan = self.planJournalQuery(category_ids=category_ids, quartiles=quartiles, statistics=self.getStatistics())
+        seen = self.getSeenKeys(self.journalQuery, plan)
+        for journals in self.iterJournalPlan(plan, page_size):
+            yield from self.iterUnseen(self.selectJournalsInCategories(journals, target_categories, quartiles), seen)
 
-            for journal_category in journal.getCategories():
-                journal_category_quartile = journal_category.getQuartile()
-                category_is_match = journal_category in target_categories
-                quartiles_match = (
-                    target_quartiles is None 
-                    or journal_category_quartile is None 
-                    or journal_category_quartile in target_quartiles
-                )
-                
-                if category_is_match and quartiles_match:
-                    valid_categories_and_quartiles = True
-                    break
-            
-            if valid_categories_and_quartiles and valid_areas and journal not in diamond_journals: 
-                diamond_journals.append(journal)
+    def iterJournalsInAreasWithLicense(self, areas_ids: set[str], licenses: set[str], page_size: int = 1000) -> Iterator[Journal]:
+        target_areas = self.getAllAreas() if not areas_ids else [self.getEntityById(area) for area in areas_ids]
+        plan = self.planJournalQuery(areas_ids=areas_ids, licenses=licenses, statistics=self.getStatistics())
+        seen = self.getSeenKeys(self.journalQuery, plan)
+        for journals in self.iterJournalPlan(plan, page_size):
+            yield from self.iterUnseen(self.selectJournalsInAreas(journals, target_areas), seen)
+
+    def iterDiamondJournalsInAreasAndCategoriesWithQuartile(self, areas_ids: set[str], category_ids: set[str], quartiles: set[str], 
+                                                            page_size: int = 1000) -> Iterator[Journal]:
+        target_areas = self.getAllAreas() if not areas_ids else [self.getEntityById(area) for area in areas_ids] 
+        target_categories = self.getAllCategories() if not category_ids else [self.getEntityById(category) for category in category_ids]
+        plan = self.planJournalQuery(category_ids=category_ids, quartiles=quartiles, areas_ids=areas_ids, apc=False, 
+                                     statistics=self.getStatistics())
+        seen = self.getSeenKeys(self.journalQuery, plan)
+        for journals in self.iterJournalPlan(plan, page_size):
+            yield from self.iterUnseen(self.selectDiamondJournals(journals, target_areas, target_categories, quartiles), seen)
+
+class JournalSnapshot:
+    # columnar copy of the journals, categories and areas: one row per journal ordinal, and the journal → category and
+    # journal → area links in CSR form (the categories of journal i are categoryIndices[categoryIndptr[i]:categoryIndptr[i + 1]])
+    def __init__(self, journals: Iterable[Journal], categories: list[Category], areas: list[Area], 
+                 category_areas_df: pd.DataFrame, category_quartiles_df: pd.DataFrame):
+        self.journals = getJournalCollection(journals) # read from its columns, the journals are built when selected
+        self.titles = pd.Series(self.journals.getColumn("title"), dtype=object).astype(str).str.lower()
+        self.publishers = pd.Series(self.journals.getColumn("publisher"), dtype=object).astype(str).str.lower()
+        self.licenses = pd.Series(self.journals.getColumn("license"), dtype=object).astype(str).str.lower()
+        self.apc = self.journals.getColumn("apc")
+        self.seal = self.journals.getColumn("seal")
+
+        self.journalOrdinals = {} # every id of a journal, and all of them together, upper case
+        for ordinal, ids in enumerate(self.journals.getColumn("journal-ids")):
+            ids_list = [id_.strip() for id_ in ids.split(",")]
+            for journal_id in [", ".join(ids_list)] + ids_list:
+                self.journalOrdinals.setdefault(journal_id.upper(), ordinal)
+
+        # vocabularies keyed like entity equality, so a code stands for all the equal entities
+        self.categories = list(categories)
+        self.categoryCodes = {category.getIdentityKey(): code for code, category in enumerate(self.categories)}
+        self.areas = list(areas)
+        self.areaCodes = {area.getIdentityKey(): code for code, area in enumerate(self.areas)}
+
+        category_indptr, category_links = self.getLinks(self.journals.categoryIndptr, self.journals.categoryLinks)
+        self.categoryIndptr, self.categoryIndices, self.categoryRows = self.createAdjacency(category_indptr, category_links, self.categories, self.categoryCodes)
+        quartiles = pd.Categorical([category.getQuartile() for category in category_links])
+        self.quartiles = quartiles.categories
+        self.categoryQuartileCodes = quartiles.codes # -1 for no quartile
+
+        area_indptr, area_links = self.getLinks(self.journals.areaIndptr, self.journals.areaLinks)
+        self.areaIndptr, self.areaIndices, self.areaRows = self.createAdjacency(area_indptr, area_links, self.areas, self.areaCodes)
+
+        # the (area, category) pairs and the (category, quartile) pairs of the whole category database
+        self.pairAreaKeys = category_areas_df["area"].astype(str).str.lower().to_numpy(dtype=object)
+        self.pairAreaCodes = self.getCodes(category_areas_df["area"], self.areaCodes)
+        self.pairCategoryKeys = category_areas_df["category"].astype(str).str.lower().to_numpy(dtype=object)
+        self.pairCategoryCodes = self.getCodes(category_areas_df["category"], self.categoryCodes)
+        self.quartileCategoryCodes = self.getCodes(category_quartiles_df["category"], self.categoryCodes)
+        self.quartileValues = category_quartiles_df["quartile"].to_numpy(dtype=object)
+
+    def getLinks(self, indptr: numpy.ndarray, links: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+        # the links of the journals of the collection, in its order
+        ordinals = self.journals.ordinals
+        counts = indptr[ordinals + 1] - indptr[ordinals]
+        selected_indptr = numpy.concatenate(([0], numpy.cumsum(counts))).astype(numpy.int64)
+        positions = numpy.arange(selected_indptr[-1], dtype=numpy.int64) + numpy.repeat(indptr[ordinals] - selected_indptr[:-1], counts)
+        return selected_indptr, links[positions]
+
+    def createAdjacency(self, indptr: numpy.ndarray, links: numpy.ndarray, vocabulary: list[IdentifiableEntity], 
+                        codes: dict[frozenset[str], int]) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        indices = numpy.empty(len(links), dtype=numpy.int32)
+        for position, entity in enumerate(links):
+            key = entity.getIdentityKey()
+            if key not in codes: # linked to a journal but missing from the list of all of them
+                codes[key] = len(vocabulary)
+                vocabulary.append(entity)
+            indices[position] = codes[key]
+        rows = numpy.repeat(numpy.arange(len(indptr) - 1), numpy.diff(indptr)) # the journal ordinal of each link
+        return indptr, indices, rows
+
+    def getCodes(self, names: pd.Series, codes: dict[frozenset[str], int]) -> numpy.ndarray:
+        return numpy.array([codes.get(frozenset([str(name).strip().casefold()]), -1) for name in names], dtype=numpy.int32)
+
+    def getEntity(self, id: str, is_journal_id: bool) -> Optional[IdentifiableEntity]:
+        if is_journal_id:
+            for journal_id in [id] + id.split(", "): # the same priority as the handlers' getByIds
+                ordinal = self.journalOrdinals.get(journal_id.upper())
+                if ordinal is not None:
+                    return self.journals[ordinal]
+            return None
+        key = frozenset([id.strip().casefold()])
+        if key in self.categoryCodes: # categories win over areas with the same name
+            return self.categories[self.categoryCodes[key]]
+        if key in self.areaCodes:
+            return self.areas[self.areaCodes[key]]
+        return None
+
+    def selectJournals(self, mask: numpy.ndarray) -> JournalCollection:
+        return self.journals.take(numpy.flatnonzero(mask))
+
+    def selectEntities(self, vocabulary: list[IdentifiableEntity], codes: numpy.ndarray) -> list[IdentifiableEntity]:
+        codes = codes[codes >= 0]
+        _, first = numpy.unique(codes, return_index=True) # each code once, in the order of its first appearance
+        return [vocabulary[code] for code in codes[numpy.sort(first)]]
+
+    def getVocabularyMask(self, entities: Iterable[Optional[IdentifiableEntity]], entity_type: type, 
+                          codes: dict[frozenset[str], int], size: int) -> numpy.ndarray:
+        mask = numpy.zeros(size, dtype=bool)
+        for entity in entities:
+            if type(entity) is entity_type and entity.getIdentityKey() in codes:
+                mask[codes[entity.getIdentityKey()]] = True
+        return mask
+
+    def getCategoryMask(self, categories: Optional[Iterable[Optional[IdentifiableEntity]]]) -> numpy.ndarray:
+        if categories is None:
+            return numpy.ones(len(self.categories), dtype=bool)
+        return self.getVocabularyMask(categories, Category, self.categoryCodes, len(self.categories))
+
+    def getAreaMask(self, areas: Optional[Iterable[Optional[IdentifiableEntity]]]) -> numpy.ndarray:
+        if areas is None:
+            return numpy.ones(len(self.areas), dtype=bool)
+        return self.getVocabularyMask(areas, Area, self.areaCodes, len(self.areas))
+
+    def getTextMask(self, values: pd.Series, partial: str) -> numpy.ndarray:
+        return values.str.contains(str(partial).lower(), regex=False).to_numpy(dtype=bool)
+
+    def getLicenseMask(self, licenses: Optional[Iterable[str]]) -> numpy.ndarray:
+        mask = numpy.zeros(len(self.journals), dtype=bool)
+        for license_val in {l.strip().lower() for l in licenses or []}:
+            mask |= self.getTextMask(self.licenses, license_val)
+        return mask
+
+    def getJournalsInCategories(self, category_mask: numpy.ndarray, quartiles: Optional[set[str]]) -> numpy.ndarray:
+        # journals with one of the categories, in one of the quartiles or with no quartile (any quartile for None)
+        links = category_mask[self.categoryIndices]
+        if quartiles is not None:
+            quartile_codes = [self.quartiles.get_loc(quartile) for quartile in quartiles if quartile in self.quartiles]
+            links &= (self.categoryQuartileCodes < 0) | numpy.isin(self.categoryQuartileCodes, quartile_codes)
+        return numpy.bincount(self.categoryRows[links], minlength=len(self.journals)) > 0
+
+    def getJournalsInAreas(self, area_mask: numpy.ndarray) -> numpy.ndarray:
+        links = area_mask[self.areaIndices]
+        return numpy.bincount(self.areaRows[links], minlength=len(self.journals)) > 0
+
+class SnapshotQueryEngine(FullQueryEngine):
+    # the methods of FullQueryEngine answered from a JournalSnapshot in memory, with masks instead of queries: the
+    # snapshot is loaded from the handlers on first use, and again with refresh() or after an upload to one of the databases
+    def __init__(self):
+        super().__init__()
+        self.snapshot = None
+        self.snapshotStamp = None
+        self.snapshotLock = threading.RLock()
+        self.loading = False # while loading, the entities are looked up in the handlers
+
+    def refresh(self) -> bool:
+        with self.snapshotLock:
+            self.loading = True
+            try:
+                stamp = self.getDataStamp()
+                errors = self.getErrorCount()
+                journals = super().getAllJournals()
+                categories = super().getAllCategories()
+                areas = super().getAllAreas()
+                category_areas_df = pd.concat([df for df in self.collectFrames(self.categoryQuery, "getCategoriesAssignedToAreas", set()) 
+                                               if not df.empty] or [pd.DataFrame(columns=["area", "category"])])
+                category_quartiles_df = pd.concat([df for df in self.collectFrames(self.categoryQuery, "getCategoryQuartiles") 
+                                                   if not df.empty] or [pd.DataFrame(columns=["category", "quartile"])])
+                if self.getErrorCount() != errors: # a partial load is not kept, so the next call tries again
+                    print("Error during refresh: a handler query failed, the previous snapshot is kept")
+                    return False
+                self.snapshot = JournalSnapshot(journals, categories, areas, category_areas_df, category_quartiles_df)
+                self.snapshotStamp = stamp
+                return True
+            except Exception as e:
+                print(f"Unexpected error during refresh: {e}")
+                return False
+            finally:
+                self.loading = False
+
+    def getSnapshot(self) -> JournalSnapshot:
+        if self.snapshot is None or self.snapshotStamp != self.getDataStamp():
+            with self.snapshotLock:
+                if self.snapshot is None or self.snapshotStamp != self.getDataStamp():
+                    if not self.refresh() and self.snapshot is None:
+                        self.snapshot = JournalSnapshot([], [], [], pd.DataFrame(columns=["area", "category"]), 
+                                                        pd.DataFrame(columns=["category", "quartile"]))
+        return self.snapshot
+
+    def getEntitiesByIds(self, ids: Iterable[str]) -> dict[str, IdentifiableEntity]:
+        if self.loading:
+            return super().getEntitiesByIds(ids)
+        snapshot = self.getSnapshot()
+        ids = list(dict.fromkeys(str(id) for id in ids if isinstance(id, str) or id))
+        journal_ids, _ = self.splitJournalIds(ids)
+        journal_ids = set(journal_ids)
+        entities = {}
+        for id in ids:
+            entity = snapshot.getEntity(id, id in journal_ids)
+            if entity is not None:
+                entities[id] = entity
+        return entities
+
+    def getTargetEntities(self, ids: set[str]) -> Optional[list[Optional[IdentifiableEntity]]]:
+        # None, for all of them, when no ids are given
+        if not ids:
+            return None
+        entities = self.getEntitiesByIds(ids)
+        return [entities.get(str(id)) for id in ids]
+
+    def getAllJournals(self) -> JournalCollection:
+        return self.getSnapshot().journals.copy() # a view, so that changing it leaves the snapshot as it is
+
+    def getJournalsWithTitle(self, partialTitle: str, limit: Optional[int] = None) -> JournalCollection:
+        snapshot = self.getSnapshot() # in snapshot order: the mask has no ranking
+        return snapshot.selectJournals(snapshot.getTextMask(snapshot.titles, partialTitle))[:limit]
+
+    def getJournalsPublishedBy(self, partialName: str, limit: Optional[int] = None) -> JournalCollection:
+        snapshot = self.getSnapshot()
+        return snapshot.selectJournals(snapshot.getTextMask(snapshot.publishers, partialName))[:limit]
+
+    def getJournalsWithLicense(self, licenses: set[str]) -> JournalCollection:
+        snapshot = self.getSnapshot()
+        return snapshot.selectJournals(snapshot.getLicenseMask(licenses))
+
+    def getJournalsWithAPC(self) -> JournalCollection:
+        snapshot = self.getSnapshot()
+        return snapshot.selectJournals(snapshot.apc)
+
+    def getJournalsWithDOAJSeal(self) -> JournalCollection:
+        snapshot = self.getSnapshot()
+        return snapshot.selectJournals(snapshot.seal)
+
+    def getAllCategories(self) -> list[Category]:
+        return list(self.getSnapshot().categories)
+
+    def getAllAreas(self) -> list[Area]:
+        return list(self.getSnapshot().areas)
+
+    def getCategoriesWithQuartile(self, quartiles: set[str] = None) -> list[Category]:
+        snapshot = self.getSnapshot()
+        if not quartiles:
+            return list(snapshot.categories)
+        matches = pd.Series(snapshot.quartileValues, dtype=object).isin(list(quartiles)).to_numpy(dtype=bool)
+        return snapshot.selectEntities(snapshot.categories, snapshot.quartileCategoryCodes[matches])
+
+    def getCategoriesAssignedToAreas(self, areas_ids: set[str]) -> list[Category]:
+        snapshot = self.getSnapshot()
+        matches = numpy.isin(snapshot.pairAreaKeys, [str(area_id).lower() for area_id in areas_ids or []])
+        return snapshot.selectEntities(snapshot.categories, snapshot.pairCategoryCodes[matches])
+
+    def getAreasAssignedToCategories(self, category_ids: set[str]) -> list[Area]:
+        snapshot = self.getSnapshot()
+        matches = numpy.isin(snapshot.pairCategoryKeys, [str(category_id).lower() for category_id in category_ids or []])
+        return snapshot.selectEntities(snapshot.areas, snapshot.pairAreaCodes[matches])
+
+    def getJournalsInCategoriesWithQuartile(self, category_ids: set[str], quartiles: set[str]) -> JournalCollection:
+        snapshot = self.getSnapshot()
+        category_mask = snapshot.getCategoryMask(self.getTargetEntities(category_ids))
+        return snapshot.selectJournals(snapshot.getJournalsInCategories(category_mask, self.getTargetQuartiles(quartiles)))
+
+    def getJournalsInAreasWithLicense(self, areas_ids: set[str], licenses: set[str]) -> JournalCollection:
+        snapshot = self.getSnapshot()
+        mask = snapshot.getJournalsInAreas(snapshot.getAreaMask(self.getTargetEntities(areas_ids)))
+        if licenses:
+            mask &= snapshot.getLicenseMask(licenses)
+        return snapshot.selectJournals(mask)
+
+    def getDiamondJournalsInAreasAndCategoriesWithQuartile(self, areas_ids: set[str], category_ids: set[str], quartiles: set[str]) -> JournalCollection:
+        snapshot = self.getSnapshot()
+        target_quartiles = quartiles if quartiles and quartiles.issubset({"Q1", "Q2", "Q3", "Q4"}) else None
+        mask = ~snapshot.apc
+        mask &= snapshot.getJournalsInAreas(snapshot.getAreaMask(self.getTargetEntities(areas_ids)))
+        mask &= snapshot.getJournalsInCategories(snapshot.getCategoryMask(self.getTargetEntities(category_ids)), target_quartiles)
+        return snapshot.selectJournals(mask)
+
+    # the snapshot is in memory already: the iterators go through the results of the methods above, with no pages to read
+    def iterAllJournals(self, page_size: int = 1000) -> Iterator[Journal]:
+        yield from self.getAllJournals()
+
+    def iterAllCategories(self, page_size: int = 1000) -> Iterator[Category]:
+        yield from self.getAllCategories()
+
+    def iterAllAreas(self, page_size: int = 1000) -> Iterator[Area]:
+        yield from self.getAllAreas()
+
+    def iterJournalsInCategoriesWithQuartile(self, category_ids: set[str], quartiles: set[str], page_size: int = 1000) -> Iterator[Journal]:
+        yield from self.getJournalsInCategoriesWithQuartile(category_ids, quartiles)
+
+    def iterJournalsInAreasWithLicense(self, areas_ids: set[str], licenses: set[str], page_size: int = 1000) -> Iterator[Journal]:
+        yield from self.getJournalsInAreasWithLicense(areas_ids, licenses)
+
+    def iterDiamondJournalsInAreasAndCategoriesWithQuartile(self, areas_ids: set[str], category_ids: set[str], quartiles: set[str], 
+                                                            page_size: int = 1000) -> Iterator[Journal]:
+        yield from self.getDiamondJournalsInAreasAndCategoriesWithQuartile(areas_ids, category_ids, quartiles)
+
+class AsyncBasicQueryEngine(BasicQueryEngine):
+    # same methods as BasicQueryEngine, as coroutines, for AsyncJournalQueryHandler and AsyncCategoryQueryHandler:
+    # the handlers are always queried at the same time, each within handlerTimeout if set
+    async def collectFrames(self, handlers: list[AsyncQueryHandler], method_name: str, *args) -> list[pd.DataFrame]:
+        calls = [getattr(handler, method_name)(*args) for handler in handlers]
+        if self.handlerTimeout is not None:
+            calls = [asyncio.wait_for(call, self.handlerTimeout) for call in calls]
+        results = await asyncio.gather(*calls, return_exceptions=True)
+
+        frames = []
+        for handler, result in zip(handlers, results):
+            if isinstance(result, BaseException) and not isinstance(result, Exception): # cancellations are not handler errors
+                raise result
+            if isinstance(result, TimeoutError): # the late handler is left out of this result
+                print(f"Timeout during '{method_name}' ({handler.queryType}): no answer from {handler.getDbPathOrUrl()} in {self.handlerTimeout} seconds")
+                handler.errorCount += 1
+                frames.append(pd.DataFrame())
+            elif isinstance(result, Exception):
+                print(f"Unexpected error during '{method_name}' ({handler.queryType}) [{type(result).__name__}]: {result}")
+                handler.errorCount += 1
+                frames.append(pd.DataFrame())
+            else:
+                frames.append(result)
+        return frames
+
+    async def getEntityById(self, id: str) -> Optional[IdentifiableEntity]:
+        return (await self.getEntitiesByIds([id])).get(str(id))
+
+    async def getEntitiesByIds(self, ids: Iterable[str]) -> dict[str, IdentifiableEntity]:
+        ids, entities = self.getCachedEntities(ids)
+        if not ids:
+            return entities
+
+        journal_ids, other_ids = self.splitJournalIds(ids)
+        journal_rows = {}
+        if journal_ids:
+            journal_rows = self.mergeRows(await self.collectFrames(self.journalQuery, "getByIds", journal_ids))
+        category_rows = {}
+        if journal_rows or other_ids:
+            category_rows = self.mergeRows(await self.collectFrames(self.categoryQuery, "getByIds", list(journal_rows) + other_ids))
+        return self.createEntities(ids, other_ids, journal_rows, category_rows, entities)
+
+    async def createJournals(self, journals_df: pd.DataFrame) -> JournalCollection:
+        journals_df, journals, missing_ids = self.prepareJournals(journals_df)
+        if not missing_ids:
+            return self.createJournalColumns(journals_df, journals)
+        return self.joinJournals(journals_df, journals, await self.collectFrames(self.categoryQuery, "getByIds", missing_ids))
+
+    async def iterAllJournals(self, page_size: int = 1000) -> AsyncIterator[Journal]:
+        # asynchronous generators, used with "async for"
+        seen = self.getSeenKeys(self.journalQuery)
+        for handler in self.journalQuery:
+            async for journals_df in self.iterPages(handler, "getFilteredJournalsPage", "s", page_size, None, None):
+                for journal in self.iterUnseen(await self.createJournals(journals_df.drop(columns="s")), seen):
+                    yield journal
+
+    async def iterAllCategories(self, page_size: int = 1000) -> AsyncIterator[Category]:
+        seen = self.getSeenKeys(self.categoryQuery)
+        for handler in self.categoryQuery:
+            async for categories_df in self.iterPages(handler, "getAllCategoriesPage", "category", page_size):
+                entities = await self.getEntitiesByIds(categories_df["category"])
+                for category in self.iterUnseen(map(entities.get, categories_df["category"]), seen):
+                    yield category
+
+    async def iterAllAreas(self, page_size: int = 1000) -> AsyncIterator[Area]:
+        seen = self.getSeenKeys(self.categoryQuery)
+        for handler in self.categoryQuery:
+            async for areas_df in self.iterPages(handler, "getAllAreasPage", "area", page_size):
+                entities = await self.getEntitiesByIds(areas_df["area"])
+                areas = (getSharedArea(entity.getIds()[0]) if isinstance(entity, Category) else entity 
+                         for entity in map(entities.get, areas_df["area"]))
+                for area in self.iterUnseen(areas, seen):
+                    yield area
+
+    async def iterPages(self, handler: AsyncQueryHandler, method_name: str, key_column: str, page_size: int, *args) -> AsyncIterator[pd.DataFrame]:
+        after = None
+        while True:
+            page_df = await getattr(handler, method_name)(*args, after, page_size)
+            if page_df.empty:
+                return
+            yield page_df
+            if page_df[key_column].nunique() < page_size:
+                return
+            after = page_df[key_column].iloc[-1]
+
+    async def collectJournals(self, method_name: str, *args) -> JournalCollection:
+        journals = []
+        for journals_df in await self.collectFrames(self.journalQuery, method_name, *args):
+            if not journals_df.empty:
+                journals.append(await self.createJournals(journals_df))
+        return self.uniqueJournals(journals)
+
+    async def collectEntities(self, method_name: str, args: tuple, id_column: str, filter_column: Optional[str] = None) -> list[IdentifiableEntity]:
+        # the entities named in id_column, keeping only the rows whose filter_column matches the first argument
+        found = []
+        for entities_df in await self.collectFrames(self.categoryQuery, method_name, *args):
+            if entities_df.empty:
+                continue
+            if filter_column is not None:
+                input_ids = {str(id).lower() for id in args[0]}
+                entities_df = entities_df[entities_df[filter_column].astype(str).str.lower().isin(input_ids)]
+
+            entities = await self.getEntitiesByIds(entities_df[id_column])
+            for id in entities_df[id_column]:
+                entity = entities.get(id)
+                if id_column == "area" and isinstance(entity, Category): # an area with the same name as a category
+                    entity = getSharedArea(entity.getIds()[0])
+                found.append(entity)
+        return self.uniqueEntities(found)
+
+    async def getAllJournals(self) -> JournalCollection:
+        return await self.collectJournals("getAllJournals")
+
+    async def getJournalsWithTitle(self, partialTitle: str, limit: Optional[int] = None) -> JournalCollection:
+        return (await self.collectJournals("getJournalsWithTitle", partialTitle, limit))[:limit]
+
+    async def getJournalsPublishedBy(self, partialName: str, limit: Optional[int] = None) -> JournalCollection:
+        return (await self.collectJournals("getJournalsPublishedBy", partialName, limit))[:limit]
 
-        return diamond_journals # per sicurezza
+    async def getJournalsWithLicense(self, licenses: set[str]) -> JournalCollection:
+        return await self.collectJournals("getJournalsWithLicense", licenses)
+
+    async def getJournalsWithAPC(self) -> JournalCollection:
+        return await self.collectJournals("getJournalsWithAPC")
+
+    async def getJournalsWithDOAJSeal(self) -> JournalCollection:
+        return await self.collectJournals("getJournalsWithDOAJSeal")
+
+    async def getAllCategories(self) -> list[Category]:
+        return await self.collectEntities("getAllCategories", (), "category")
+
+    async def getAllAreas(self) -> list[Area]:
+        return await self.collectEntities("getAllAreas", (), "area")
+
+    async def getCategoriesWithQuartile(self, quartiles: set[str] = None) -> list[Category]:
+        return await self.collectEntities("getCategoriesWithQuartile", (quartiles,), "category")
+
+    async def getCategoriesAssignedToAreas(self, areas_ids: set[str]) -> list[Category]:
+        return await self.collectEntities("getCategoriesAssignedToAreas", (areas_ids,), "category", "area")
+
+    async def getAreasAssignedToCategories(self, category_ids: set[str]) -> list[Area]:
+        return await self.collectEntities("getAreasAssignedToCategories", (category_ids,), "area", "category")
+
+class AsyncFullQueryEngine(AsyncBasicQueryEngine, FullQueryEngine):
+    # the selections are FullQueryEngine's, the inputs they need are fetched at the same time
+    async def getTargetEntities(self, ids: set[str], getAll) -> list[IdentifiableEntity]:
+        if not ids:
+            return await getAll()
+        entities = await self.getEntitiesByIds(ids)
+        return [entities.get(str(id)) for id in ids]
+
+    async def getStatistics(self) -> dict[str, pd.DataFrame]:
+        stamp = self.getDataStamp()
+        if self.statistics is None or self.statisticsStamp != stamp:
+            journals_dfs, categories_dfs = await asyncio.gather(
+                self.collectFrames(self.journalQuery, "getStatistics"), self.collectFrames(self.categoryQuery, "getStatistics")
+            )
+            self.statistics = {"journals": mergeStatistics(journals_dfs), "categories": mergeStatistics(categories_dfs)}
+            self.statisticsStamp = stamp
+        return self.statistics
+
+    async def runJournalPlan(self, plan: dict) -> JournalCollection:
+        identifiers = None
+        journals_dfs = None
+        if plan["order"] == "categories-first":
+            identifiers_call = self.collectFrames(self.categoryQuery, "getJournalIdentifiers", plan["categories"], plan["quartiles"], plan["areas"])
+            if plan["join"] == "hash-join": # the two stores are independent, so they are queried at the same time
+                identifiers_dfs, journals_dfs = await asyncio.gather(
+                    identifiers_call, self.collectFrames(self.journalQuery, "getFilteredJournals", None, plan["licenses"], plan["apc"])
+                )
+            else:
+                identifiers_dfs = await identifiers_call
+            identifiers = self.getPlannedIdentifiers(plan, identifiers_dfs)
+            if not identifiers:
+                return concatJournalCollections([])
+
+        if journals_dfs is None:
+            pushed_identifiers = identifiers if plan["join"] == "values-probe" else None
+            journals_dfs = await self.collectFrames(self.journalQuery, "getFilteredJournals", pushed_identifiers, plan["licenses"], plan["apc"])
+
+        journals = []
+        for journals_df in self.filterPlannedJournals(plan, identifiers, journals_dfs):
+            journals.append(await self.createJournals(journals_df))
+        return self.uniqueJournals(journals)
+
+    async def explain(self, method_name: str, *args) -> dict:
+        if method_name not in ("getJournalsInCategoriesWithQuartile", "getJournalsInAreasWithLicense", 
+                               "getDiamondJournalsInAreasAndCategoriesWithQuartile"):
+            print(f"No plan to explain for '{method_name}'")
+            return {}
+        token = self.latestPlan.set({})
+        try:
+            await getattr(self, method_name)(*args)
+            return self.latestPlan.get()
+        finally:
+            self.latestPlan.reset(token)
+
+    async def getJournalsInCategoriesWithQuartile(self, category_ids: set[str], quartiles: set[str]) -> JournalCollection:
+        plan = self.planJournalQuery(category_ids=category_ids, quartiles=quartiles, statistics=await self.getStatistics())
+        target_categories, journals = await asyncio.gather(self.getTargetEntities(category_ids, self.getAllCategories), self.runJournalPlan(plan))
+        return self.finishPlan("getJournalsInCategoriesWithQuartile", plan, self.selectJournalsInCategories(journals, target_categories, quartiles))
+
+    async def getJournalsInAreasWithLicense(self, areas_ids: set[str], licenses: set[str]) -> JournalCollection:
+        plan = self.planJournalQuery(areas_ids=areas_ids, licenses=licenses, statistics=await self.getStatistics())
+        target_areas, journals = await asyncio.gather(self.getTargetEntities(areas_ids, self.getAllAreas), self.runJournalPlan(plan))
+        return self.finishPlan("getJournalsInAreasWithLicense", plan, self.selectJournalsInAreas(journals, target_areas))
+
+    async def getDiamondJournalsInAreasAndCategoriesWithQuartile(self, areas_ids: set[str], category_ids: set[str], quartiles: set[str]) -> JournalCollection:
+        plan = self.planJournalQuery(category_ids=category_ids, quartiles=quartiles, areas_ids=areas_ids, apc=False, 
+                                     statistics=await self.getStatistics())
+        target_areas, target_categories, journals = await asyncio.gather(
+            self.getTargetEntities(areas_ids, self.getAllAreas), self.getTargetEntities(category_ids, self.getAllCategories), 
+            self.runJournalPlan(plan)
+        )
+        journals = self.selectDiamondJournals(journals, target_areas, target_categories, quartiles)
+        return self.finishPlan("getDiamondJournalsInAreasAndCategoriesWithQuartile", plan, journals)
+
+    async def iterJournalPlan(self, plan: dict, page_size: int) -> AsyncIterator[JournalCollection]:
+        identifiers = None
+        if plan["order"] == "categories-first":
+            identifiers = self.getPlannedIdentifiers(plan, await self.collectFrames(
+                self.categoryQuery, "getJournalIdentifiers", plan["categories"], plan["quartiles"], plan["areas"]
+            ))
+            if not identifiers:
+                return
+
+        if identifiers is not None and plan["join"] == "values-probe":
+            for start in range(0, len(identifiers), page_size):
+                journals_dfs = await self.collectFrames(self.journalQuery, "getFilteredJournals", identifiers[start:start + page_size], 
+                                                        plan["licenses"], plan["apc"])
+                yield await self.createPlannedJournals(plan, identifiers, journals_dfs)
+        else:
+            for handler in self.journalQuery:
+                async for journals_df in self.iterPages(handler, "getFilteredJournalsPage", "s", page_size, plan["licenses"], plan["apc"]):
+                    yield await self.createPlannedJournals(plan, identifiers, [journals_df.drop(columns="s")])
+
+    async def createPlannedJournals(self, plan: dict, identifiers: Optional[list[str]], journals_dfs: list[pd.DataFrame]) -> JournalCollection:
+        return concatJournalCollections([await self.createJournals(journals_df) 
+                                         for journals_df in self.filterPlannedJournals(plan, identifiers, journals_dfs)])
+
+    async def iterJournalsInCategoriesWithQuartile(self, category_ids: set[str], quartiles: set[str], page_size: int = 1000) -> AsyncIterator[Journal]:
+        plan = self.planJournalQuery(category_ids=category_ids, quartiles=quartiles, statistics=await self.getStatistics())
+        target_categories = await self.getTargetEntities(category_ids, self.getAllCategories)
+        seen = self.getSeenKeys(self.journalQuery, plan)
+        async for journals in self.iterJournalPlan(plan, page_size):
+            for journal in self.iterUnseen(self.selectJournalsInCategories(journals, target_categories, quartiles), seen):
+                yield journal
+
+    async def iterJournalsInAreasWithLicense(self, areas_ids: set[str], licenses: set[str], page_size: int = 1000) -> AsyncIterator[Journal]:
+        plan = self.planJournalQuery(areas_ids=areas_ids, licenses=licenses, statistics=await self.getStatistics())
+        target_areas = await self.getTargetEntities(areas_ids, self.getAllAreas)
+        seen = self.getSeenKeys(self.journalQuery, plan)
+        async for journals in self.iterJournalPlan(plan, page_size):
+            for journal in self.iterUnseen(self.selectJournalsInAreas(journals, target_areas), seen):
+                yield journal
+
+    async def iterDiamondJournalsInAreasAndCategoriesWithQuartile(self, areas_ids: set[str], category_ids: set[str], quartiles: set[str], 
+                                                                  page_size: int = 1000) -> AsyncIterator[Journal]:
+        plan = self.planJournalQuery(category_ids=category_ids, quartiles=quartiles, areas_ids=areas_ids, apc=False, 
+                                     statistics=await self.getStatistics())
+        target_areas, target_categories = await asyncio.gather(
+            self.getTargetEntities(areas_ids, self.getAllAreas), self.getTargetEntities(category_ids, self.getAllCategories)
+        )
+        seen = self.getSeenKeys(self.journalQuery, plan)
+        async for journals in self.iterJournalPlan(plan, page_size):
+            for journal in self.iterUnseen(self.selectDiamondJournals(journals, target_areas, target_categories, quartiles), seen):
+                yield journal
         
 
 # ! for testing purposes 